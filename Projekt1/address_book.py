@@ -1,17 +1,161 @@
 from collections import UserDict
+import calendar
+from contextlib import contextmanager, nullcontext
+import functools
+import heapq
+from itertools import islice
+import os
 import re
 import pickle
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
+
+NGRAM_SIZE = 3
+FEB_29_SLOT = 59  # Calendar slot of 29 February, see birthday_slot
+
+PHONE_PATTERN = re.compile(r"^\d{9}$")
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+# Accepts exactly what strptime(value, "%Y-%m-%d") accepts, e.g. also "2000-1-5"
+BIRTHDAY_PATTERN = re.compile(r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])")
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    """Returns the set of lowercase n-grams of the text."""
+    text = text.lower()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def phone_key(number):
+    """Returns the digits of a phone number without the +48 country code."""
+    digits = ''.join(char for char in number if char.isdigit())
+    if len(digits) == 11 and digits.startswith('48'):
+        digits = digits[2:]
+    return digits
+
+def birthday_slot(month, day):
+    """Returns the 0-365 calendar slot of a day, counted in a leap year."""
+    return date(2000, month, day).timetuple().tm_yday - 1
+
+def parse_birthday(value):
+    """Parses a YYYY-MM-DD date, returning None if it is invalid."""
+    if len(value) == 10 and value[4] == value[7] == "-" and value.isascii():
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass  # e.g. "2000-1-05" or a day out of range, checked below
+    match = BIRTHDAY_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    try:
+        return date(int(match[1]), int(match[2]), int(match[3]))
+    except ValueError:
+        return None
+
+def birthday_on(bday, year):
+    """Returns the birthday in the given year; 29 February falls on 1 March
+    in non-leap years."""
+    if bday.month == 2 and bday.day == 29 and not calendar.isleap(year):
+        return datetime(year, 3, 1)
+    return datetime(year, bday.month, bday.day)
+
+
+class RWLock:
+    """Readers-writer lock: many readers or a single writer at a time.
+
+    Writers are preferred, so a steady stream of lookups cannot starve
+    changes. Both sides are reentrant, and the writer may also read.
+    A reader must not try to write; that would deadlock.
+    """
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = None  # ident of the thread holding the write lock
+        self.write_depth = 0
+        self.waiting_writers = 0
+        self.local = threading.local()  # per-thread read depth
+
+    @contextmanager
+    def reading(self):
+        me = threading.get_ident()
+        depth = getattr(self.local, 'depth', 0)
+        if depth or self.writer == me:
+            # Already reading or writing in this thread
+            self.local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self.local.depth = depth
+            return
+        with self.condition:
+            while self.writer is not None or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        self.local.depth = 1
+        try:
+            yield
+        finally:
+            self.local.depth = 0
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        me = threading.get_ident()
+        with self.condition:
+            if self.writer != me:
+                self.waiting_writers += 1
+                try:
+                    while self.writer is not None or self.readers:
+                        self.condition.wait()
+                finally:
+                    self.waiting_writers -= 1
+                self.writer = me
+            self.write_depth += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.write_depth -= 1
+                if not self.write_depth:
+                    self.writer = None
+                    self.condition.notify_all()
+
+
+def record_edit(method):
+    """Runs a Record edit under the write lock of its book, if it has one."""
+    @functools.wraps(method)
+    def edit(self, *args, **kwargs):
+        book = self._book  # read once, remove_record may clear it meanwhile
+        with book.writing() if book is not None else nullcontext():
+            return method(self, *args, **kwargs)
+    return edit
+
 
 class Field:
-    """Base class for entry fields."""
+    """Base class for entry fields.
+
+    Fields and records use __slots__ instead of a per-instance __dict__,
+    which makes large books considerably smaller in memory.
+    """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
+    def __getstate__(self):
+        return {'value': self.value}
+
+    def __setstate__(self, state):
+        # Pickles made before __slots__ hold the same dict
+        self.value = state['value']
+
 class Name(Field):
-    pass
+    __slots__ = ()
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         if not self.validate_phone(value):
             raise ValueError("Niepoprawny numer telefonu")
@@ -19,10 +163,11 @@ class Phone(Field):
 
     @staticmethod
     def validate_phone(value):
-        pattern = re.compile(r"^\d{9}$")
-        return pattern.match(value) is not None
+        return PHONE_PATTERN.match(value) is not None
 
 class Email(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         if not self.validate_email(value):
             raise ValueError("Niepoprawny adres email")
@@ -30,70 +175,123 @@ class Email(Field):
 
     @staticmethod
     def validate_email(value):
-        pattern = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
-        return pattern.match(value) is not None
+        return EMAIL_PATTERN.match(value) is not None
 
 class Birthday(Field):
+    __slots__ = ('date',)  # The parsed value, so it is never parsed again
+
     def __init__(self, value):
-        if not self.validate_birthday(value):
+        parsed = parse_birthday(value)
+        if parsed is None:
             raise ValueError("Niepoprawna data urodzenia")
         super().__init__(value)
+        self.date = parsed
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.date = parse_birthday(self.value)
 
     @staticmethod
     def validate_birthday(value):
-        try:
-            datetime.strptime(value, "%Y-%m-%d")
-            return True
-        except ValueError:
-            return False
+        return parse_birthday(value) is not None
 
 class Record:
+    __slots__ = ('id', 'name', 'phones', 'emails', 'birthday', '_book')
+
     def __init__(self, name: Name, birthday: Birthday = None):
         self.id = None  # The ID will be assigned by AddressBook
         self.name = name
         self.phones = []
         self.emails = []
         self.birthday = birthday
+        self._book = None  # The AddressBook that indexes this record
+
+    def __getstate__(self):
+        """Leaves the book back-reference out of the pickled state."""
+        return {'id': self.id, 'name': self.name, 'phones': self.phones,
+                'emails': self.emails, 'birthday': self.birthday}
+
+    def __setstate__(self, state):
+        """Restores a record, also from pickles made before __slots__."""
+        self._book = None
+        self.birthday = None
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def _changed(self):
+        """Tells the owning book that this record was edited."""
+        if self._book is not None:
+            self._book.record_changed(self)
 
+    def _check_contacts(self, phones=(), emails=()):
+        """Lets the owning book refuse phones or emails used by another record."""
+        if self._book is not None:
+            self._book.check_contacts(self, phones, emails)
+
+    @record_edit
     def add_phone(self, phone: Phone):
         """Adds a phone number."""
+        self._check_contacts(phones=[phone])
         self.phones.append(phone)
+        self._changed()
 
+    @record_edit
     def remove_phone(self, phone: Phone):
         """Removes a phone number."""
         self.phones.remove(phone)
+        self._changed()
 
+    @record_edit
     def edit_phone(self, old_phone: Phone, new_phone: Phone):
         """Changes a phone number."""
+        self._check_contacts(phones=[new_phone])
         self.remove_phone(old_phone)
         self.add_phone(new_phone)
 
+    @record_edit
     def add_email(self, email: Email):
         """Adds an email address."""
+        self._check_contacts(emails=[email])
         self.emails.append(email)
+        self._changed()
 
+    @record_edit
     def remove_email(self, email: Email):
         """Removes an email address."""
         self.emails.remove(email)
+        self._changed()
 
+    @record_edit
     def edit_email(self, old_email: Email, new_email: Email):
         """Changes an email address."""
+        self._check_contacts(emails=[new_email])
         self.remove_email(old_email)
         self.add_email(new_email)
 
+    @record_edit
     def edit_name(self, new_name: Name):
         """Changes the first and last name."""
         self.name = new_name
+        self._changed()
+
+    @record_edit
+    def edit_birthday(self, new_birthday: Birthday):
+        """Changes the birthday."""
+        self.birthday = new_birthday
+        self._changed()
 
-    def days_to_birthday(self):
-        """Returns the number of days to the next birthday."""
+    def days_to_birthday(self, today=None):
+        """Returns the number of days to the next birthday.
+
+        today defaults to the current date and time; pass it in when
+        computing this for many records at once.
+        """
         if not self.birthday or not self.birthday.value:
             return "Brak daty urodzenia"
-        today = datetime.now()
-        bday = datetime.strptime(self.birthday.value, "%Y-%m-%d")
-        next_birthday = bday.replace(year=today.year)
+        today = today or datetime.now()
+        next_birthday = birthday_on(self.birthday.date, today.year)
         if today > next_birthday:
-            next_birthday = next_birthday.replace(year=today.year + 1)
+            next_birthday = birthday_on(self.birthday.date, today.year + 1)
         return (next_birthday - today).days
 
     def __str__(self):
@@ -105,25 +303,242 @@ class Record:
         return f"ID: {self.id}, Imię i nazwisko: {self.name.value}, " \
                f"Telefony: {phones}, Email: {emails}{birthday_str}{days_to_bday_str}"
 
+class IdAllocator:
+    """Hands out record IDs, reusing the lowest freed ID first.
+
+    Freed IDs wait in a min-heap, so allocating and releasing an ID takes
+    O(log n). An ID taken out of the pool by take() stays in the heap and
+    is skipped when it comes up.
+    """
+    def __init__(self, next_id=1, free_ids=()):
+        self.next_id = next_id  # lowest ID never handed out
+        self.free_ids = set(free_ids)
+        self.heap = sorted(self.free_ids)
+
+    def allocate(self):
+        while self.heap:
+            record_id = heapq.heappop(self.heap)
+            if record_id in self.free_ids:
+                self.free_ids.remove(record_id)
+                return record_id
+        record_id = self.next_id
+        self.next_id += 1
+        return record_id
+
+    def release(self, record_id):
+        if record_id not in self.free_ids:
+            self.free_ids.add(record_id)
+            heapq.heappush(self.heap, record_id)
+
+    def take(self, record_id):
+        """Marks a freed ID as used again, e.g. when replaying the journal."""
+        if record_id in self.free_ids:
+            self.free_ids.remove(record_id)
+            if len(self.heap) > 2 * len(self.free_ids) + 64:
+                self.heap = sorted(self.free_ids)  # drop the skipped entries
+
+
 class AddressBook(UserDict):
     def __init__(self):
         super().__init__()
-        self.next_id = 1
-        self.free_ids = set()
+        self.ids = IdAllocator()
+        self.journal = None  # Journal that persists changes, see load_address_book
+        self.ngram_index = {}  # n-gram -> IDs of records containing it
+        self.record_texts = {}  # record ID -> strings indexed for it, to find its n-grams again
+        self.record_order = {}  # record ID -> insertion sequence number
+        self.next_order = 0
+        self.birthday_index = [{} for _ in range(366)]  # calendar slot -> {ID: record}
+        self.record_birthday_slot = {}  # record ID -> calendar slot of its birthday
+        self.phone_index = {}  # phone_key -> IDs of records with that phone
+        self.email_index = {}  # lowercase email -> IDs of records with that email
+        self.record_contacts = {}  # record ID -> (phone keys, email keys) indexed for it
+        self.unique_contacts = False  # Refuse a phone or email already used by another record
+        self.version = 0  # Bumped on every change, checked by RecordPages
+
+    @staticmethod
+    def record_search_texts(record):
+        """Returns the name, phones and emails of a record as the indexed strings.
+
+        The strings are the ones the record holds, so keeping them costs only
+        the tuple, far less than keeping their n-grams.
+        """
+        return ((record.name.value,) + tuple(phone.value for phone in record.phones)
+                + tuple(email.value for email in record.emails))
+
+    @staticmethod
+    def search_ngrams(texts):
+        """Returns the n-grams of all the given strings."""
+        grams = set()
+        for text in texts:
+            grams |= ngrams(text)
+        return grams
+
+    def index_contacts(self, record):
+        """Adds the phones and emails of a record to the exact lookup indexes."""
+        phone_keys = {phone_key(phone.value) for phone in record.phones}
+        email_keys = {email.value.lower() for email in record.emails}
+        self.record_contacts[record.id] = (phone_keys, email_keys)
+        for key in phone_keys:
+            self.phone_index.setdefault(key, set()).add(record.id)
+        for key in email_keys:
+            self.email_index.setdefault(key, set()).add(record.id)
+
+    def unindex_contacts(self, record_id):
+        phone_keys, email_keys = self.record_contacts.pop(record_id, ((), ()))
+        for index, keys in ((self.phone_index, phone_keys), (self.email_index, email_keys)):
+            for key in keys:
+                ids = index[key]
+                ids.discard(record_id)
+                if not ids:
+                    del index[key]
+
+    def check_contacts(self, record, phones=None, emails=None):
+        """Raises ValueError if unique_contacts is set and one of the phones or
+        emails (by default those of the record) belongs to another record."""
+        if not self.unique_contacts:
+            return
+        for phone in record.phones if phones is None else phones:
+            if self.phone_index.get(phone_key(phone.value), set()) - {record.id}:
+                raise ValueError(f"Numer telefonu {phone.value} jest już przypisany do innego wpisu")
+        for email in record.emails if emails is None else emails:
+            if self.email_index.get(email.value.lower(), set()) - {record.id}:
+                raise ValueError(f"Adres email {email.value} jest już przypisany do innego wpisu")
+
+    def index_record(self, record, contacts=True):
+        """Adds a record to the search index."""
+        record._book = self
+        if contacts:
+            self.index_contacts(record)
+        texts = self.record_search_texts(record)
+        self.record_texts[record.id] = texts
+        for gram in self.search_ngrams(texts):
+            self.ngram_index.setdefault(gram, set()).add(record.id)
+        if record.id not in self.record_order:
+            self.record_order[record.id] = self.next_order
+            self.next_order += 1
+        if record.birthday and record.birthday.value:
+            bday = record.birthday.date
+            slot = birthday_slot(bday.month, bday.day)
+            self.record_birthday_slot[record.id] = slot
+            self.birthday_index[slot][record.id] = record
+
+    def unindex_record(self, record_id, keep_order=False):
+        """Removes a record from the search index."""
+        for gram in self.search_ngrams(self.record_texts.pop(record_id, ())):
+            ids = self.ngram_index[gram]
+            ids.discard(record_id)
+            if not ids:
+                del self.ngram_index[gram]
+        self.unindex_contacts(record_id)
+        slot = self.record_birthday_slot.pop(record_id, None)
+        if slot is not None:
+            del self.birthday_index[slot][record_id]
+        if not keep_order:
+            self.record_order.pop(record_id, None)
+
+    def writing(self):
+        """Returns the context a record edit runs in; ConcurrentAddressBook locks it."""
+        return nullcontext()
+
+    def record_changed(self, record):
+        """Refreshes the search index and journals an edited record."""
+        if self.data.get(record.id) is record:
+            self.version += 1
+            self.unindex_record(record.id, keep_order=True)
+            self.index_record(record)
+            self.log_change(('put', record, self.ids.next_id))
+
+    def log_change(self, entry):
+        """Appends a change to the journal, if the book has one."""
+        if self.journal is not None:
+            self.journal.append(entry, self)
+
+    def apply_change(self, entry):
+        """Replays a single journal entry without journaling it again."""
+        self.version += 1
+        if entry[0] == 'put':
+            _, record, next_id = entry
+            if record.id in self.data:
+                self.unindex_record(record.id, keep_order=True)
+            self.data[record.id] = record
+            self.index_record(record)
+            self.ids.take(record.id)
+            self.ids.next_id = next_id
+        elif entry[0] == 'delete':
+            _, record_id = entry
+            if record_id in self.data:
+                del self.data[record_id]
+                self.unindex_record(record_id)
+            self.ids.release(record_id)
+
+    def rebuild_index(self):
+        """Rebuilds the search index from scratch, e.g. after loading."""
+        self.ngram_index = {}
+        self.record_texts = {}
+        self.record_order = {}
+        self.next_order = 0
+        self.birthday_index = [{} for _ in range(366)]
+        self.record_birthday_slot = {}
+        self.phone_index = {}
+        self.email_index = {}
+        self.record_contacts = {}
+        for record in self.data.values():
+            self.index_record(record)
+
+    def allocate_id(self):
+        """Returns the lowest freed ID, or the next unused one."""
+        record_id = self.ids.allocate()
+        while record_id in self.data:  # Only if a snapshot was written inconsistently
+            record_id = self.ids.allocate()
+        return record_id
 
     def add_record(self, record: Record):
         """Adds an entry to the address book with ID management."""
-        while self.next_id in self.data or self.next_id in self.free_ids:
-            self.next_id += 1
-        if self.free_ids:
-            record.id = min(self.free_ids)
-            self.free_ids.remove(record.id)
-        else:
-            record.id = self.next_id
-            self.next_id += 1
+        record.id = None
+        self.check_contacts(record)
+        record.id = self.allocate_id()
         self.data[record.id] = record
+        self.version += 1
+        self.index_record(record)
+        self.log_change(('put', record, self.ids.next_id))
         print(f"Dodano wpis z ID: {record.id}.")
 
+    def add_records(self, records):
+        """Adds many entries at once and returns how many were added.
+
+        Nothing is printed per record. Phones and emails are indexed as each
+        record is stored, so unique_contacts also catches duplicates within
+        the batch; the other indexes are filled in one pass at the end. A
+        journaled book writes a single snapshot instead of one journal
+        entry per record. On a ValueError the records stored so far stay.
+        """
+        added = []
+        try:
+            for record in records:
+                record.id = None
+                self.check_contacts(record)
+                record.id = self.allocate_id()
+                self.data[record.id] = record
+                self.index_contacts(record)
+                added.append(record)
+        finally:
+            if added:
+                self.version += 1
+                for record in added:
+                    self.index_record(record, contacts=False)
+                if self.journal is not None:
+                    self.journal.compact(self)
+        return len(added)
+
+    def remove_record(self, record_id):
+        """Removes a record, releases its ID and drops it from the index."""
+        record = self.data.pop(record_id)
+        self.version += 1
+        self.unindex_record(record_id)
+        record._book = None
+        self.ids.release(record_id)
+        self.log_change(('delete', record_id))
+
     def delete_record_by_id(self):
         """Deletes a record based on ID."""
         user_input = input("Podaj ID rekordu, który chcesz usunąć: ").strip()
@@ -132,18 +547,32 @@ class AddressBook(UserDict):
         try:
             record_id = int(record_id_str)
             if record_id in self.data:
-                del self.data[record_id]
-                self.free_ids.add(record_id)
+                self.remove_record(record_id)
                 print(f"Usunięto rekord o ID: {record_id}.")
             else:
                 print("Nie znaleziono rekordu o podanym ID.")
         except ValueError:
             print("Nieprawidłowe ID. Proszę podać liczbę.")
 
+    def search_candidates(self, search_term):
+        """Returns the records that may contain the phrase, in book order."""
+        grams = ngrams(search_term)
+        if not grams:
+            return self.data.values()
+        candidate_ids = None
+        for gram in sorted(grams, key=lambda g: len(self.ngram_index.get(g, ()))):
+            ids = self.ngram_index.get(gram)
+            if not ids:
+                return []
+            candidate_ids = set(ids) if candidate_ids is None else candidate_ids & ids
+            if not candidate_ids:
+                return []
+        return self.records_by_ids(candidate_ids)
+
     def find_record(self, search_term):
         """Finds entries containing the exact phrase provided."""
         found_records = []
-        for record in self.data.values():
+        for record in self.search_candidates(search_term):
             if search_term.lower() in record.name.value.lower():
                 found_records.append(record)
                 continue
@@ -157,12 +586,27 @@ class AddressBook(UserDict):
                     break
         return found_records
 
+    def records_by_ids(self, ids):
+        return [self.data[record_id] for record_id in sorted(ids, key=self.record_order.__getitem__)]
+
+    def find_by_phone(self, number):
+        """Returns the records with this phone number, in book order.
+
+        Numbers are compared by their digits, so "123 456 789" and
+        "+48 123-456-789" both find 123456789.
+        """
+        return self.records_by_ids(self.phone_index.get(phone_key(number), ()))
+
+    def find_by_email(self, address):
+        """Returns the records with this email address, ignoring case."""
+        return self.records_by_ids(self.email_index.get(address.strip().lower(), ()))
+
     def find_records_by_name(self, name):
         """Finds records that match the given name and surname."""
         matching_records = []
-        for record_id, record in self.data.items():
+        for record in self.search_candidates(name):
             if name.lower() in record.name.value.lower():
-                matching_records.append((record_id, record))
+                matching_records.append((record.id, record))
         return matching_records
 
 
@@ -182,8 +626,7 @@ class AddressBook(UserDict):
         try:
             record_id_to_delete = int(input("Podaj ID rekordu, który chcesz usunąć: "))
             if record_id_to_delete in self.data:
-                del self.data[record_id_to_delete]
-                self.free_ids.add(record_id_to_delete)  # Add the ID back to the free ID pool
+                self.remove_record(record_id_to_delete)  # Also returns the ID to the free ID pool
                 print(f"Usunięto rekord o ID: {record_id_to_delete}.")
             else:
                 print("Nie znaleziono rekordu o podanym ID.")
@@ -191,6 +634,26 @@ class AddressBook(UserDict):
             print("Nieprawidłowe ID. Proszę podać liczbę.")
 
 
+    def upcoming_birthdays(self, days, today=None):
+        """Returns records with a birthday within the given number of days.
+
+        Records come ordered by date. In non-leap years birthdays on
+        29 February are celebrated on 1 March.
+        """
+        today = today or date.today()
+        found_records = []
+        seen_slots = set()
+        for offset in range(min(days, 366) + 1):
+            day = today + timedelta(days=offset)
+            slots = [birthday_slot(day.month, day.day)]
+            if day.month == 3 and day.day == 1 and not calendar.isleap(day.year):
+                slots.insert(0, FEB_29_SLOT)
+            for slot in slots:
+                if slot not in seen_slots:
+                    seen_slots.add(slot)
+                    found_records.extend(self.birthday_index[slot].values())
+        return found_records
+
     def show_all_records(self):
         """Displays all entries in the address book."""
         if not self.data:
@@ -199,18 +662,85 @@ class AddressBook(UserDict):
         for name, record in self.data.items():
             print(record)
 
+    def pages(self, page_size=5):
+        """Returns a new iterator over pages of at most page_size records."""
+        return RecordPages(self, page_size)
+
+    def __iter__(self):
+        """Returns an iterator over pages of five address book records."""
+        return self.pages()
+
+
+def read_locked(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.reading():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def write_locked(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.writing():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class ConcurrentAddressBook(AddressBook):
+    """AddressBook that many threads can use at once.
+
+    Lookups share a readers-writer lock and run in parallel; changes,
+    including edits made through a Record of the book, hold it exclusively,
+    so ID allocation, the indexes and the journal stay consistent. Paging
+    is not locked and fails as usual when the book changes meanwhile.
+    """
+    def __init__(self):
+        super().__init__()
+        self.lock = RWLock()
+
+    def writing(self):
+        return self.lock.writing()
+
+    search_candidates = read_locked(AddressBook.search_candidates)
+    find_record = read_locked(AddressBook.find_record)
+    find_records_by_name = read_locked(AddressBook.find_records_by_name)
+    find_by_phone = read_locked(AddressBook.find_by_phone)
+    find_by_email = read_locked(AddressBook.find_by_email)
+    upcoming_birthdays = read_locked(AddressBook.upcoming_birthdays)
+
+    record_changed = write_locked(AddressBook.record_changed)
+    apply_change = write_locked(AddressBook.apply_change)
+    rebuild_index = write_locked(AddressBook.rebuild_index)
+    add_record = write_locked(AddressBook.add_record)
+    add_records = write_locked(AddressBook.add_records)
+    remove_record = write_locked(AddressBook.remove_record)
+
+
+class RecordPages:
+    """Independent page iterator over the records of an AddressBook.
+
+    Each iterator keeps its own cursor into the book, so several can run at
+    once. Changing the book while paging raises RuntimeError.
+    """
+    def __init__(self, book, page_size=5):
+        if page_size < 1:
+            raise ValueError("Rozmiar strony musi być dodatni")
+        self.book = book
+        self.page_size = page_size
+        self.version = book.version
+        self.records = iter(book.data.values())
+
     def __iter__(self):
-        """Returns an iterator over the address book records."""
-        self.current = 0
         return self
 
     def __next__(self):
-        if self.current < len(self.data):
-            records = list(self.data.values())[self.current:self.current+5]
-            self.current += 5
-            return records
-        else:
+        if self.book.version != self.version:
+            raise RuntimeError("Książka adresowa zmieniła się podczas przeglądania")
+        records = list(islice(self.records, self.page_size))
+        if not records:
             raise StopIteration
+        return records
 
 
 def edit_record(book):
@@ -276,28 +806,177 @@ def edit_record(book):
     else:
         print("Wpisu nie znaleziono.")
 
+class BookUnpickler(pickle.Unpickler):
+    """Unpickler that also finds the classes of books written while this
+    module ran as a script, where they were pickled as __main__.Record."""
+    def find_class(self, module, name):
+        if module == '__main__':
+            module = __name__
+        return super().find_class(module, name)
+
+
+class Journal:
+    """Append-only log of address book changes on top of a pickled snapshot.
+
+    Every add, edit and delete is appended to the journal file and fsynced
+    in batches of ``sync_every`` changes. Once the journal outgrows the book
+    it is compacted into a new snapshot, which replaces the old one atomically.
+    """
+    def __init__(self, filename, sync_every=100, compact_min=1000):
+        self.filename = filename
+        self.journal_filename = filename + '.journal'
+        self.sync_every = sync_every
+        self.compact_min = compact_min
+        self.file = None
+        self.entries = 0  # entries in the journal file since the last snapshot
+        self.valid_size = 0  # bytes of the journal up to the last complete entry
+        self.pending = 0  # entries written but not yet fsynced
+
+    def read(self, book=None):
+        """Returns the book from the snapshot with the journal replayed,
+        without opening the journal for writing.
+
+        Fills the given empty book, e.g. a ConcurrentAddressBook, or a new
+        AddressBook. A torn last entry is skipped; any other error in the
+        journal is raised.
+        """
+        book = AddressBook() if book is None else book
+        try:
+            with open(self.filename, 'rb') as file:
+                state = BookUnpickler(file).load()
+        except FileNotFoundError:
+            state = {}
+        if isinstance(state, dict) and 'data' in state:
+            book.data = state['data']
+            book.ids = IdAllocator(state['next_id'], state['free_ids'])
+        else:
+            # Old snapshots contain only book.data; their gaps are free IDs
+            book.data = state
+            max_id = max(book.data, default=0)
+            book.ids = IdAllocator(max_id + 1, set(range(1, max_id)) - book.data.keys())
+        book.rebuild_index()
+
+        self.entries = 0
+        self.valid_size = 0
+        try:
+            with open(self.journal_filename, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                while True:
+                    try:
+                        entry = BookUnpickler(file).load()
+                    except (EOFError, pickle.UnpicklingError):
+                        if file.tell() < size:
+                            raise  # Damage before the end is not a torn write
+                        break  # End of the journal or a torn write from a crash
+                    book.apply_change(entry)
+                    self.entries += 1
+                    self.valid_size = file.tell()
+        except FileNotFoundError:
+            pass
+        return book
+
+    def load(self, book=None):
+        """Returns the book like read() and opens the journal for appending,
+        dropping a torn last entry."""
+        book = self.read(book)
+        self.file = open(self.journal_filename, 'ab')
+        self.file.truncate(self.valid_size)
+        book.journal = self
+        return book
+
+    def append(self, entry, book):
+        """Writes an entry and syncs or compacts when a batch is full."""
+        pickle.dump(entry, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.entries += 1
+        self.pending += 1
+        if self.entries >= max(self.compact_min, len(book.data)):
+            self.compact(book)
+        elif self.pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Flushes pending journal entries to disk."""
+        if self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def compact(self, book):
+        """Writes a fresh snapshot and empties the journal."""
+        state = {'data': book.data, 'next_id': book.ids.next_id, 'free_ids': book.ids.free_ids}
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.filename)
+        sync_directory(self.filename)
+        # Replaying the old journal over the new snapshot gives the same book,
+        # so a crash before the truncate below loses nothing.
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.entries = 0
+        self.pending = 0
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+
+def sync_directory(filename):
+    """Makes a rename inside the file's directory durable where supported."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def move_aside(filename):
+    """Renames a file to filename.bak, or .bak1, .bak2, ... if that is taken,
+    and returns the new name."""
+    candidate = filename + '.bak'
+    counter = 1
+    while os.path.lexists(candidate):
+        candidate = f"{filename}.bak{counter}"
+        counter += 1
+    os.rename(filename, candidate)
+    return candidate
+
 def save_address_book(book, filename='address_book.pkl'):
     try:
-        with open(filename, 'wb') as file:
-            pickle.dump(book.data, file)
+        if book.journal is None:
+            # The book was not loaded from these files, e.g. loading failed,
+            # so they are kept aside instead of being compacted over
+            for name in (filename, filename + '.journal'):
+                if os.path.exists(name):
+                    print(f"Plik {name} zachowano jako {move_aside(name)}.")
+            book.journal = Journal(filename)
+            book.journal.file = open(book.journal.journal_filename, 'ab')
+            book.journal.compact(book)
+        else:
+            book.journal.sync()
         print("Zapisano książkę adresową.")
     except Exception as e:
         print(f"Błąd przy zapisie książki adresowej: {e}")
 
 def load_address_book(filename='address_book.pkl'):
+    exists = os.path.exists(filename) or os.path.exists(filename + '.journal')
     try:
-        with open(filename, 'rb') as file:
-            data = pickle.load(file)
-        book = AddressBook()
-        book.data = data
-        print("Przywrócono książkę adresową.")
-        return book
-    except FileNotFoundError:
-        print("Plik nie istnieje, tworzenie nowej książki adresowej.")
-        return AddressBook()
+        book = Journal(filename).load()
     except Exception as e:
         print(f"Błąd przy ładowaniu książki adresowej: {e}")
+        print("Zapis utworzy nową książkę, a obecne pliki zostaną zachowane jako kopie .bak.")
         return AddressBook()
+    if exists:
+        print("Przywrócono książkę adresową.")
+    else:
+        print("Plik nie istnieje, tworzenie nowej książki adresowej.")
+    return book
 
 def input_phone():
     """Asks the user to enter a phone number."""
@@ -366,7 +1045,7 @@ def main():
     """The main app function"""
     book = load_address_book()
     while True:
-        action = input("Wybierz akcję: dodaj (d), znajdź (z), usuń (u), edytuj (e), pokaż wszystkie (p), koniec (q): ")
+        action = input("Wybierz akcję: dodaj (d), znajdź (z), usuń (u), edytuj (e), pokaż wszystkie (p), urodziny (b), koniec (q): ")
         if action in ['dodaj', 'add', 'd']:
             record = create_record()
             book.add_record(record)
@@ -391,6 +1070,13 @@ def main():
                 except StopIteration:
                     print("Koniec listy.")
                     break
+        elif action in ['urodziny', 'b']:
+            days = input("Podaj liczbę dni: ")
+            if days.isdigit():
+                for record in book.upcoming_birthdays(int(days)):
+                    print(record)
+            else:
+                print("Nieprawidłowa liczba dni.")
         elif action in ["koniec", "q"]:
             save_address_book(book)
             break
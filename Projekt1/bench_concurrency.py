@@ -0,0 +1,92 @@
+"""Stress benchmark of ConcurrentAddressBook lookups.
+
+Fills a book with synthetic contacts and lets a growing number of reader
+threads run exact phone lookups and phrase searches for a fixed time,
+optionally while a writer thread keeps editing records. Reports lookups
+per second for every thread count.
+
+Usage: python bench_concurrency.py [--records 20000] [--threads 1,2,4,8,16] [--seconds 2] [--writer]
+"""
+import argparse
+import random
+import threading
+import time
+
+from address_book import ConcurrentAddressBook, Email, Name, Phone, Record
+
+
+def build_book(count, seed):
+    rng = random.Random(seed)
+    phones = rng.sample(range(10**8, 10**9), count)
+    records = []
+    for index, number in enumerate(phones):
+        record = Record(Name(f"Kontakt {index}"))
+        record.phones.append(Phone(str(number)))
+        record.emails.append(Email(f"kontakt.{index}@example.com"))
+        records.append(record)
+    book = ConcurrentAddressBook()
+    book.add_records(records)
+    return book, [str(number) for number in phones]
+
+
+def reader(book, phones, stop, counts, slot, seed):
+    rng = random.Random(seed)
+    lookups = 0
+    while not stop.is_set():
+        if lookups % 10:
+            book.find_by_phone(rng.choice(phones))
+        else:
+            book.find_record(f"Kontakt {rng.randrange(len(phones))}")
+        lookups += 1
+    counts[slot] = lookups
+
+
+def writer(book, stop, counts, seed):
+    rng = random.Random(seed)
+    record_ids = list(book.data)
+    edits = 0
+    while not stop.is_set():
+        record = book.data[rng.choice(record_ids)]
+        record.edit_email(record.emails[0], Email(f"zmiana.{edits}@example.com"))
+        edits += 1
+    counts['writer'] = edits
+
+
+def run(book, phones, threads, seconds, with_writer):
+    stop = threading.Event()
+    counts = {}
+    workers = [threading.Thread(target=reader, args=(book, phones, stop, counts, slot, slot))
+               for slot in range(threads)]
+    if with_writer:
+        workers.append(threading.Thread(target=writer, args=(book, stop, counts, threads)))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    lookups = sum(count for key, count in counts.items() if key != 'writer')
+    return lookups / seconds, counts.get('writer', 0) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Przepustowość wyszukiwania w ConcurrentAddressBook.')
+    parser.add_argument('--records', type=int, default=20000, help='liczba rekordów (domyślnie 20000)')
+    parser.add_argument('--threads', default='1,2,4,8,16', help='liczby wątków czytających (domyślnie 1,2,4,8,16)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='czas jednego pomiaru (domyślnie 2 s)')
+    parser.add_argument('--writer', action='store_true', help='dodaj wątek, który ciągle edytuje rekordy')
+    parser.add_argument('--seed', type=int, default=0, help='ziarno generatora (domyślnie 0)')
+    args = parser.parse_args()
+
+    book, phones = build_book(args.records, args.seed)
+    print(f"Rekordów: {args.records}, wątek piszący: {'tak' if args.writer else 'nie'}")
+    for threads in (int(value) for value in args.threads.split(',')):
+        lookups, edits = run(book, phones, threads, args.seconds, args.writer)
+        line = f"Wątków: {threads:3d}  wyszukiwań/s: {lookups:10.0f}"
+        if args.writer:
+            line += f"  edycji/s: {edits:8.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
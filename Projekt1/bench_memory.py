@@ -0,0 +1,110 @@
+"""Memory benchmark of address book records.
+
+Builds the same synthetic records twice, once with dict based classes as
+they were before __slots__ and once with the current classes, and reports
+the bytes per record measured with tracemalloc. The whole AddressBook,
+search and birthday indexes included, is measured as well. The indexes
+cost several times more than the slotted records themselves, most of it
+the n-gram index that find_record searches.
+
+Usage: python bench_memory.py [--records 100000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import tracemalloc
+
+from address_book import AddressBook, Birthday, Email, Name, Phone, Record
+
+FIRST_NAMES = ['Jan', 'Anna', 'Piotr', 'Katarzyna', 'Tomasz', 'Małgorzata', 'Paweł', 'Agnieszka']
+LAST_NAMES = ['Kowalski', 'Nowak', 'Wiśniewski', 'Wójcik', 'Kamińska', 'Lewandowska', 'Zieliński']
+
+
+class DictField:
+    def __init__(self, value):
+        self.value = value
+
+
+class DictRecord:
+    def __init__(self, name, birthday=None):
+        self.id = None
+        self.name = name
+        self.phones = []
+        self.emails = []
+        self.birthday = birthday
+
+
+def sample_rows(count, seed):
+    """Returns (name, phone, email, birthday) tuples of synthetic contacts."""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append((f"{first} {last} {index}",
+                     f"{rng.randrange(10**8, 10**9)}",
+                     f"kontakt.{index}@example.com",
+                     f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"))
+    return rows
+
+
+def build_dict_records(rows):
+    records = []
+    for index, (name, phone, email, birthday) in enumerate(rows, start=1):
+        record = DictRecord(DictField(name), DictField(birthday))
+        record.id = index
+        record.phones.append(DictField(phone))
+        record.emails.append(DictField(email))
+        records.append(record)
+    return records
+
+
+def build_records(rows):
+    records = []
+    for index, (name, phone, email, birthday) in enumerate(rows, start=1):
+        record = Record(Name(name), Birthday(birthday))
+        record.id = index
+        record.add_phone(Phone(phone))
+        record.add_email(Email(email))
+        records.append(record)
+    return records
+
+
+def build_book(rows):
+    book = AddressBook()
+    with contextlib.redirect_stdout(io.StringIO()):  # add_record reports every entry
+        for record in build_records(rows):
+            book.add_record(record)
+    return book
+
+
+def measure(build, rows):
+    """Returns the bytes allocated by build(rows) that are still alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zużycie pamięci rekordów książki adresowej.')
+    parser.add_argument('--records', type=int, default=100000, help='liczba rekordów (domyślnie 100000)')
+    parser.add_argument('--seed', type=int, default=0, help='ziarno generatora (domyślnie 0)')
+    args = parser.parse_args()
+
+    rows = sample_rows(args.records, args.seed)
+    before = measure(build_dict_records, rows)
+    after = measure(build_records, rows)
+    book = measure(build_book, rows)
+    print(f"Rekordów: {args.records}")
+    print(f"Rekordy z __dict__:        {before / args.records:8.0f} B/rekord")
+    print(f"Rekordy z __slots__:       {after / args.records:8.0f} B/rekord "
+          f"({100 * (before - after) / before:.0f}% mniej)")
+    print(f"AddressBook z indeksami:   {book / args.records:8.0f} B/rekord")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Streaming export of the address book to CSV and JSON Lines.
+
+Records are turned into rows one at a time and written in buffered
+chunks, so the whole export never sits in memory as text. The reference
+time for "days to birthday" is taken once per export.
+
+Usage: python exporter.py kontakty.csv [--format csv|jsonl] [--book address_book.pkl]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+from address_book import Journal
+
+BUFFER_SIZE = 256 * 1024  # characters collected before each write to the output
+COLUMNS = ['id', 'name', 'phones', 'emails', 'birthday', 'days_to_birthday']
+MULTI_VALUE_SEPARATOR = ';'  # the same separator importer.py reads
+
+
+def export_rows(book, today=None):
+    """Yields a dict of plain values for every record, in book order."""
+    today = today or datetime.now()
+    for record in book.data.values():
+        birthday = record.birthday.value if record.birthday else None
+        yield {
+            'id': record.id,
+            'name': record.name.value,
+            'phones': [phone.value for phone in record.phones],
+            'emails': [email.value for email in record.emails],
+            'birthday': birthday,
+            'days_to_birthday': record.days_to_birthday(today) if birthday else None,
+        }
+
+
+def csv_chunks(rows):
+    """Yields CSV text in chunks of about BUFFER_SIZE characters."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([row['id'], row['name'],
+                         MULTI_VALUE_SEPARATOR.join(row['phones']),
+                         MULTI_VALUE_SEPARATOR.join(row['emails']),
+                         row['birthday'] or '',
+                         '' if row['days_to_birthday'] is None else row['days_to_birthday']])
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonl_chunks(rows):
+    """Yields JSON Lines text in chunks of about BUFFER_SIZE characters."""
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= BUFFER_SIZE:
+            lines.append('')
+            yield '\n'.join(lines)
+            lines = []
+            size = 0
+    if lines:
+        lines.append('')
+        yield '\n'.join(lines)
+
+
+FORMATS = {'csv': csv_chunks, 'jsonl': jsonl_chunks}
+
+
+def export_book(book, file, file_format='csv', today=None):
+    """Writes the book to an open text file and returns the record count.
+
+    Open the file with newline='' for CSV, as the csv module expects.
+    """
+    rows = export_rows(book, today)
+    for chunk in FORMATS[file_format](rows):
+        file.write(chunk)
+    return len(book.data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Eksport książki adresowej do CSV lub JSON Lines.')
+    parser.add_argument('target', help='plik wynikowy')
+    parser.add_argument('--format', choices=sorted(FORMATS),
+                        help='format pliku (domyślnie według rozszerzenia)')
+    parser.add_argument('--book', default='address_book.pkl', help='plik książki adresowej')
+    args = parser.parse_args()
+
+    file_format = args.format or ('jsonl' if args.target.lower().endswith(('.jsonl', '.json')) else 'csv')
+    if not (os.path.exists(args.book) or os.path.exists(args.book + '.journal')):
+        sys.exit(f"Plik książki adresowej {args.book} nie istnieje.")
+    try:
+        # Only reads the book; the journal is left as it is for the app
+        book = Journal(args.book).read()
+    except Exception as e:
+        sys.exit(f"Błąd przy ładowaniu książki adresowej: {e}")
+    with open(args.target, 'w', encoding='utf-8', newline='') as file:
+        count = export_book(book, file, file_format)
+    print(f"Wyeksportowano wpisów: {count}.")
+
+
+if __name__ == "__main__":
+    main()
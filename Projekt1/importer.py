@@ -0,0 +1,240 @@
+"""Bulk import of contacts from CSV and vCard files into the address book.
+
+Input is read as a stream and validated in batches, optionally on a pool
+of processes. Rows with an invalid phone, email or birthday are not
+imported; they are collected with the reason and can be written to a
+rejects report.
+
+Usage: python importer.py kontakty.csv [--format csv|vcard] [--book address_book.pkl]
+                          [--workers 4] [--batch-size 10000] [--rejects odrzucone.csv]
+"""
+import argparse
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from address_book import Birthday, Email, Journal, Name, Phone, Record, save_address_book
+
+BATCH_SIZE = 10000
+MULTI_VALUE_SEPARATOR = ';'  # separates several phones or emails in one CSV cell
+
+# Accepted CSV headers, lowercase, for each field
+CSV_COLUMNS = {
+    'name': ('name', 'imię i nazwisko', 'imie i nazwisko', 'nazwa'),
+    'phones': ('phone', 'phones', 'telefon', 'telefony'),
+    'emails': ('email', 'emails', 'e-mail'),
+    'birthday': ('birthday', 'urodziny', 'data urodzenia'),
+}
+
+
+class ContactRow:
+    """Raw, not yet validated contact data with its position in the input."""
+    __slots__ = ('line', 'name', 'phones', 'emails', 'birthday')
+
+    def __init__(self, line, name, phones, emails, birthday):
+        self.line = line
+        self.name = name
+        self.phones = phones
+        self.emails = emails
+        self.birthday = birthday
+
+
+def split_values(cell):
+    return [value.strip() for value in (cell or '').split(MULTI_VALUE_SEPARATOR) if value.strip()]
+
+
+def read_csv(file):
+    """Yields a ContactRow for every data row of a CSV file with a header."""
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = {}
+    for position, title in enumerate(header):
+        title = title.strip().lower()
+        for field, titles in CSV_COLUMNS.items():
+            if title in titles and field not in positions:
+                positions[field] = position
+    if 'name' not in positions:
+        raise ValueError("Brak kolumny z imieniem i nazwiskiem w nagłówku CSV")
+
+    def cell(row, field):
+        position = positions.get(field)
+        return row[position] if position is not None and position < len(row) else ''
+
+    for row in reader:
+        if not any(row):
+            continue
+        yield ContactRow(reader.line_num, cell(row, 'name').strip(), split_values(cell(row, 'phones')),
+                         split_values(cell(row, 'emails')), cell(row, 'birthday').strip())
+
+
+def unfolded_lines(file):
+    """Yields (line number, logical line) of a vCard file, joining folded lines."""
+    current = None
+    start = 0
+    for number, line in enumerate(file, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def vcard_birthday(value):
+    """Converts the basic vCard date 19900517 to 1990-05-17."""
+    if len(value) == 8 and value.isdigit():
+        return f"{value[:4]}-{value[4:6]}-{value[6:]}"
+    return value
+
+
+def read_vcard(file):
+    """Yields a ContactRow for every BEGIN:VCARD ... END:VCARD block."""
+    card = None
+    for number, line in unfolded_lines(file):
+        key, _, value = line.partition(':')
+        # Drops parameters (TEL;TYPE=cell) and group prefixes (item1.EMAIL)
+        key = key.split(';', 1)[0].rsplit('.', 1)[-1].upper()
+        value = value.strip()
+        if key == 'BEGIN' and value.upper() == 'VCARD':
+            card = ContactRow(number, '', [], [], '')
+        elif card is None:
+            continue
+        elif key == 'END' and value.upper() == 'VCARD':
+            yield card
+            card = None
+        elif key == 'FN':
+            card.name = value
+        elif key == 'TEL' and value:
+            card.phones.append(value)
+        elif key == 'EMAIL' and value:
+            card.emails.append(value)
+        elif key == 'BDAY':
+            card.birthday = vcard_birthday(value)
+
+
+READERS = {'csv': read_csv, 'vcard': read_vcard}
+
+
+def build_record(row):
+    """Returns a Record for a row; raises ValueError naming the bad field."""
+    if not row.name:
+        raise ValueError("Brak imienia i nazwiska")
+    record = Record(Name(row.name), Birthday(row.birthday) if row.birthday else None)
+    # The record is not in a book yet, so filling the lists skips _changed
+    record.phones = [Phone(phone) for phone in row.phones]
+    record.emails = [Email(email) for email in row.emails]
+    return record
+
+
+def validate_batch(rows):
+    """Returns (records, rejects) for a batch.
+
+    records are (line, Record) pairs and rejects are (line, name, error).
+    """
+    records = []
+    rejects = []
+    for row in rows:
+        try:
+            records.append((row.line, build_record(row)))
+        except ValueError as error:
+            rejects.append((row.line, row.name, str(error)))
+    return records, rejects
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def validated_batches(rows, batch_size=BATCH_SIZE, workers=1):
+    """Yields validate_batch results in input order.
+
+    With workers > 1 the batches are validated in worker processes, with
+    at most two batches per worker in flight to bound memory.
+    """
+    if workers <= 1:
+        for batch in batches(rows, batch_size):
+            yield validate_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for batch in batches(rows, batch_size):
+            pending.append(executor.submit(validate_batch, batch))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def import_contacts(book, file, file_format='csv', batch_size=BATCH_SIZE, workers=1):
+    """Imports contacts from an open text file into the book.
+
+    Returns (number of records added, list of rejects). With the book's
+    unique_contacts set, contacts whose phone or email is already taken,
+    also by an earlier row, are rejected too.
+    """
+    rejects = []
+
+    def records():
+        for batch_records, batch_rejects in validated_batches(READERS[file_format](file), batch_size, workers):
+            rejects.extend(batch_rejects)
+            for line, record in batch_records:
+                try:
+                    # add_records indexes contacts as it goes, so this sees earlier rows
+                    book.check_contacts(record)
+                except ValueError as error:
+                    rejects.append((line, record.name.value, str(error)))
+                    continue
+                yield record
+
+    added = book.add_records(records())
+    return added, rejects
+
+
+def write_rejects(rejects, file):
+    """Writes the rejects report as CSV."""
+    writer = csv.writer(file)
+    writer.writerow(['wiersz', 'imię i nazwisko', 'błąd'])
+    writer.writerows(rejects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import kontaktów z pliku CSV lub vCard do książki adresowej.')
+    parser.add_argument('source', help='plik CSV lub vCard (.vcf)')
+    parser.add_argument('--format', choices=sorted(READERS),
+                        help='format pliku (domyślnie według rozszerzenia)')
+    parser.add_argument('--book', default='address_book.pkl', help='plik książki adresowej')
+    parser.add_argument('--workers', type=int, default=1, help='procesy sprawdzające dane (domyślnie 1)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'wiersze w jednej partii (domyślnie {BATCH_SIZE})')
+    parser.add_argument('--rejects', help='zapisz odrzucone wiersze do pliku CSV')
+    args = parser.parse_args()
+
+    file_format = args.format or ('vcard' if args.source.lower().endswith(('.vcf', '.vcard')) else 'csv')
+    try:
+        # Refuses to import into a book that could not be read; saving it would replace the files
+        book = Journal(args.book).load()
+    except Exception as e:
+        sys.exit(f"Błąd przy ładowaniu książki adresowej: {e}")
+    with open(args.source, encoding='utf-8-sig', newline='') as file:
+        added, rejects = import_contacts(book, file, file_format, args.batch_size, args.workers)
+    save_address_book(book, args.book)
+    print(f"Zaimportowano wpisów: {added}, odrzucono: {len(rejects)}.")
+    if rejects and args.rejects:
+        with open(args.rejects, 'w', encoding='utf-8', newline='') as file:
+            write_rejects(rejects, file)
+        print(f"Odrzucone wiersze zapisano w pliku {args.rejects}.")
+
+
+if __name__ == "__main__":
+    main()
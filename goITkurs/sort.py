@@ -1,37 +1,88 @@
 import os
 import shutil
 import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+FILE_CATEGORIES = {
+    'images': ['jpeg', 'png', 'jpg', 'svg'],
+    'videos': ['avi', 'mp4', 'mov', 'mkv'],
+    'documents': ['doc', 'docx', 'txt', 'pdf', 'xlsx', 'pptx'],
+    'music': ['mp3', 'ogg', 'wav', 'amr'],
+    'archives': ['zip', 'gz', 'tar'],
+    'unknown': []
+}
+
+
+TRANSLITERATION = str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ', 'acelnoszzACELNOSZZ')
+NON_WORD = re.compile(r'\W+')
 
 def normalize(name):
-    transliteration = {'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n', 'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z'}
-    name = ''.join(transliteration.get(c, c) for c in name)
-    return re.sub(r'\W+', '_', name)
-
-def organize_files(directory):
-    file_categories = {
-        'images': ['jpeg', 'png', 'jpg', 'svg'],
-        'videos': ['avi', 'mp4', 'mov', 'mkv'],
-        'documents': ['doc', 'docx', 'txt', 'pdf', 'xlsx', 'pptx'],
-        'music': ['mp3', 'ogg', 'wav', 'amr'],
-        'archives': ['zip', 'gz', 'tar'],
-        'unknown': []
-    }
-
-    for category in file_categories.keys():
+    return NON_WORD.sub('_', name.translate(TRANSLITERATION))
+
+def move_to_category(directory, category, filename, new_filename, created):
+    """Moves a file into a category folder, creating the folder on first use."""
+    if category not in created:
         os.makedirs(os.path.join(directory, category), exist_ok=True)
+        created.add(category)
+    shutil.move(os.path.join(directory, filename), os.path.join(directory, category, new_filename))
+
+def organize_directory(directory):
+    """Sorts the files of a single folder and returns its subfolders to visit."""
+    # Read the whole listing before moving anything out of the folder
+    with os.scandir(directory) as it:
+        entries = list(it)
 
-    for filename in os.listdir(directory):
-        if os.path.isfile(os.path.join(directory, filename)):
+    created = set()
+    subfolders = []
+    for entry in entries:
+        # DirEntry caches the file type, so there is no extra stat per file
+        if entry.is_file():
+            filename = entry.name
             ext = filename.lower().split('.')[-1]
             new_filename = normalize(filename)
-            for category, extensions in file_categories.items():
+            for category, extensions in FILE_CATEGORIES.items():
                 if ext in extensions:
-                    shutil.move(os.path.join(directory, filename), os.path.join(directory, category, new_filename))
+                    move_to_category(directory, category, filename, new_filename, created)
                     break
             else:
                 if ext != new_filename.split('.')[-1]:
-                    shutil.move(os.path.join(directory, filename), os.path.join(directory, 'unknown', new_filename))
-    for foldername in os.listdir(directory):
-        subfolder = os.path.join(directory, foldername)
-        if os.path.isdir(subfolder) and foldername not in file_categories:
-            organize_files(subfolder)
+                    move_to_category(directory, 'unknown', filename, new_filename, created)
+        elif entry.is_dir() and entry.name not in FILE_CATEGORIES:
+            subfolders.append(entry.path)
+    return subfolders
+
+def organize_files(directory, workers=1):
+    """Sorts the folder tree; with workers > 1 subfolders go to a thread pool.
+
+    Folders are processed from a work queue, so any depth works, and each
+    folder is visited once by (device, inode), so symlink loops end.
+    """
+    seen = set()
+
+    def first_visit(folder):
+        try:
+            stat = os.stat(folder)
+        except OSError:
+            return False
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    if workers <= 1:
+        folders = [directory]
+        while folders:
+            folder = folders.pop()
+            if first_visit(folder):
+                folders.extend(reversed(organize_directory(folder)))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(organize_directory, directory)} if first_visit(directory) else set()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for subfolder in future.result():
+                    if first_visit(subfolder):
+                        pending.add(executor.submit(organize_directory, subfolder))
@@ -0,0 +1,45 @@
+"""Micro-benchmark of clean_folder.clean.normalize against the old implementation.
+
+Usage: python bench_normalize.py [liczba_nazw]
+"""
+import random
+import re
+import sys
+import timeit
+
+from clean_folder.clean import normalize, normalize_cached
+
+
+def normalize_legacy(name):
+    transliteration = {'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n', 'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z'}
+    name = ''.join(transliteration.get(c, c) for c in name)
+    return re.sub(r'\W+', '_', name)
+
+
+def sample_names(count, seed=0):
+    rng = random.Random(seed)
+    words = ['zdjęcie', 'Łódź', 'wakacje 2023', 'raport (kopia)', 'Źródło', 'ŚWIĘTA', 'notatki', 'IMG_0001']
+    extensions = ['jpg', 'png', 'mp4', 'docx', 'txt', 'zip', 'mp3']
+    return [f"{rng.choice(words)} {rng.choice(words)} {i}.{rng.choice(extensions)}" for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    names = sample_names(count)
+    # Repeated names show what the memo cache gives on trees with many copies
+    repeated = names[:count // 100 or 1] * 100
+
+    for label, function, data in [
+        ('legacy', normalize_legacy, names),
+        ('translate', normalize, names),
+        ('legacy, repeated names', normalize_legacy, repeated),
+        ('translate, repeated names', normalize, repeated),
+        ('cached, repeated names', normalize_cached, repeated),
+    ]:
+        normalize_cached.cache_clear()
+        seconds = min(timeit.repeat(lambda: [function(name) for name in data], number=1, repeat=3))
+        print(f"{label:28} {len(data) / seconds:12,.0f} nazw/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Benchmark of clean_folder.clean.organize_files on synthetic folder trees.
+
+Generates a reproducible tree in a temporary folder, sorts it and reports
+the time of each phase (scan, normalize, move), files per second and file
+system calls per file as JSON, so results of different runs can be compared.
+
+Usage: python benchmark.py [--depth 3] [--fanout 4] [--files 10000] [--output wynik.json]
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from clean_folder import clean
+
+DEFAULT_EXTENSIONS = 'jpg:20,png:10,mp4:5,mov:2,docx:10,pdf:10,txt:10,mp3:8,ogg:2,zip:5,gz:2,dat:10,:6'
+WORDS = ['raport', 'zdjęcie', 'wakacje', 'Łódź', 'źródło', 'ŚWIĘTA', 'notatki', 'IMG', 'kopia (2)', 'dane']
+POLISH_WORDS = ['zażółć', 'gęślą', 'jaźń', 'Żółw', 'ĄĘ', 'świerszcz']
+
+# os functions counted as file system calls; shutil and os.path go through them too
+COUNTED_CALLS = ['scandir', 'listdir', 'stat', 'lstat', 'rename', 'replace', 'mkdir',
+                 'unlink', 'link', 'open', 'read', 'copy_file_range', 'sendfile']
+
+
+def parse_extensions(spec):
+    """Parses 'jpg:20,png:10,:5' into extensions and weights; '' is no extension."""
+    extensions, weights = [], []
+    for item in spec.split(','):
+        extension, _, weight = item.partition(':')
+        extensions.append(extension)
+        weights.append(float(weight or 1))
+    return extensions, weights
+
+
+def generate_tree(root, depth, fanout, files, extensions, weights, polish_ratio, seed):
+    """Creates folders depth levels deep with fanout subfolders each and
+    spreads the given number of files over them. Returns the file count."""
+    rng = random.Random(seed)
+    folders = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [os.path.join(folder, f"folder {i}") for folder in level for i in range(fanout)]
+        folders.extend(level)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+    for index in range(files):
+        words = POLISH_WORDS if rng.random() < polish_ratio else WORDS
+        name = f"{rng.choice(words)} {rng.choice(words)} {index}"
+        extension = rng.choices(extensions, weights)[0]
+        if extension:
+            name += '.' + extension
+        with open(os.path.join(rng.choice(folders), name), 'wb') as file:
+            file.write(b'x' * rng.randint(0, 256))
+    return files
+
+
+class CallCounter:
+    """Counts calls of os functions while active."""
+    def __init__(self, names):
+        self.names = [name for name in names if hasattr(os, name)]
+        self.counts = dict.fromkeys(self.names, 0)
+        self.originals = {}
+
+    def __enter__(self):
+        for name in self.names:
+            original = self.originals[name] = getattr(os, name)
+
+            @functools.wraps(original)
+            def counted(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+            setattr(os, name, counted)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self.originals.items():
+            setattr(os, name, original)
+
+
+class PhaseTimer:
+    """Adds up the time spent in functions of the clean module while active.
+
+    Calls from several threads are added up, so with workers > 1 a phase
+    may take longer than the whole run.
+    """
+    def __init__(self, names):
+        self.seconds = dict.fromkeys(names, 0.0)
+        self.originals = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        for name in self.seconds:
+            original = self.originals[name] = getattr(clean, name)
+
+            @functools.wraps(original)
+            def timed(*args, _name=name, _original=original, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    with self.lock:
+                        self.seconds[_name] += elapsed
+            setattr(clean, name, timed)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self.originals.items():
+            setattr(clean, name, original)
+
+
+def count_sorted(root):
+    """Returns (files in category folders, folders holding category folders)."""
+    moved = 0
+    folders = set()
+    for folder, subfolders, filenames in os.walk(root):
+        if os.path.basename(folder) in clean.FILE_CATEGORIES:
+            moved += len(filenames)
+            folders.add(os.path.dirname(folder))
+    return moved, len(folders)
+
+
+def run_once(args, extensions, weights):
+    root = tempfile.mkdtemp(prefix='clean_folder_bench_', dir=args.tmpdir)
+    try:
+        files = generate_tree(root, args.depth, args.fanout, args.files, extensions, weights,
+                              args.polish_ratio, args.seed)
+        # organize_files looks these up in clean at call time, so the timers see every call
+        with PhaseTimer(['build_plan', 'normalize', 'execute_plan']) as timer, \
+                CallCounter(COUNTED_CALLS) as counter:
+            start = time.perf_counter()
+            clean.organize_files(root, args.workers)
+            total = time.perf_counter() - start
+        moved, folders = count_sorted(root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    calls = sum(counter.counts.values())
+    phases = timer.seconds
+    return {
+        'files': files,
+        'moved': moved,
+        'folders': folders,
+        'seconds': {
+            'total': total,
+            # normalize runs inside build_plan, for every planned name
+            'scan': max(phases['build_plan'] - phases['normalize'], 0.0),
+            'normalize': phases['normalize'],
+            'move': phases['execute_plan'],
+        },
+        'files_per_second': files / total if total else None,
+        'syscalls': counter.counts,
+        'syscalls_per_file': calls / files if files else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark organize_files na syntetycznym drzewie folderów.')
+    parser.add_argument('--depth', type=int, default=3, help='głębokość drzewa (domyślnie 3)')
+    parser.add_argument('--fanout', type=int, default=4, help='podfoldery w każdym folderze (domyślnie 4)')
+    parser.add_argument('--files', type=int, default=10000, help='liczba plików (domyślnie 10000)')
+    parser.add_argument('--extensions', default=DEFAULT_EXTENSIONS,
+                        help='rozszerzenia z wagami, np. "jpg:20,txt:5,:1" (puste = bez rozszerzenia)')
+    parser.add_argument('--polish-ratio', type=float, default=0.3,
+                        help='udział nazw z polskimi znakami (domyślnie 0.3)')
+    parser.add_argument('--workers', type=int, default=1, help='wątki organize_files (domyślnie 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='liczba powtórzeń (domyślnie 3)')
+    parser.add_argument('--seed', type=int, default=0, help='ziarno generatora (domyślnie 0)')
+    parser.add_argument('--tmpdir', help='gdzie tworzyć drzewa testowe (domyślnie katalog tymczasowy)')
+    parser.add_argument('--output', help='zapisz wynik JSON do pliku zamiast na standardowe wyjście')
+    args = parser.parse_args()
+
+    extensions, weights = parse_extensions(args.extensions)
+    runs = [run_once(args, extensions, weights) for _ in range(args.repeat)]
+    result = {
+        'benchmark': 'organize_files',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'best': min(runs, key=lambda run: run['seconds']['total']),
+        'runs': runs,
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,354 @@
 import os
-import shutil
 import re
-import sys
+from functools import lru_cache
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
+from clean_folder.dedup import deduplicate_plan
+from clean_folder.extract import extract_archives
+from clean_folder.move import MoveStats
+from clean_folder.plan import MovePlan, execute_plan
+from clean_folder.sniff import Sniffer
+from clean_folder.state import DirectoryState
+from clean_folder.watch import watch
+
+FILE_CATEGORIES = {
+    'images': ['jpeg', 'png', 'jpg', 'svg'],
+    'videos': ['avi', 'mp4', 'mov', 'mkv'],
+    'documents': ['doc', 'docx', 'txt', 'pdf', 'xlsx', 'pptx'],
+    'music': ['mp3', 'ogg', 'wav', 'amr'],
+    'archives': ['zip', 'gz', 'tar'],
+    'unknown': []
+}
+
+EXTENSION_CATEGORIES = {ext: category for category, extensions in FILE_CATEGORIES.items() for ext in extensions}
 
 def main():
-    if len(sys.argv) > 1:
-        organize_files(sys.argv[1])
-    else:
+    parser = argparse.ArgumentParser(prog='clean-folder', description='Sortuje pliki w folderze według kategorii.')
+    parser.add_argument('directory', nargs='?', help='folder do posortowania')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='liczba wątków przetwarzających podfoldery (domyślnie 1)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='tylko zaplanuj przeniesienia, niczego nie zmieniaj')
+    parser.add_argument('--plan', metavar='PLIK',
+                        help='zapisz plan do pliku, aby można go było wznowić')
+    parser.add_argument('--resume', metavar='PLIK',
+                        help='wznów przerwane wykonanie zapisanego planu')
+    parser.add_argument('--state', metavar='PLIK',
+                        help='plik stanu do przyrostowych uruchomień; pomija niezmienione foldery')
+    parser.add_argument('--sniff', action='store_true',
+                        help='rozpoznawaj pliki bez znanego rozszerzenia po zawartości')
+    parser.add_argument('--sniff-cache', metavar='PLIK',
+                        help='plik z wynikami rozpoznawania, aby nie czytać plików ponownie (włącza --sniff)')
+    parser.add_argument('--dedup', choices=['report', 'link'],
+                        help='wykrywaj duplikaty, także plików już posortowanych: zostaw je '
+                             'na miejscu (report) lub zastąp twardymi dowiązaniami (link)')
+    parser.add_argument('--extract', action='store_true',
+                        help='rozpakuj archiwa do archives/<nazwa>/')
+    parser.add_argument('--extract-workers', type=int, metavar='N',
+                        help='liczba procesów rozpakowujących (domyślnie liczba procesorów)')
+    parser.add_argument('--watch', action='store_true',
+                        help='po posortowaniu obserwuj folder i sortuj nowe pliki na bieżąco')
+    parser.add_argument('--poll', action='store_true',
+                        help='w trybie --watch sprawdzaj zmiany okresowo zamiast przez inotify')
+    parser.add_argument('--debounce', type=float, default=1.0, metavar='SEK',
+                        help='w trybie --watch odczekaj tyle sekund ciszy przed sortowaniem (domyślnie 1)')
+    parser.add_argument('--stats', action='store_true',
+                        help='pokaż liczbę plików i przepustowość przenoszenia dla każdej kategorii')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='liczba przeniesień między zapisami postępu (domyślnie 1000)')
+    args = parser.parse_args()
+
+    stats = MoveStats() if args.stats else None
+    if args.resume:
+        plan = MovePlan.load(args.resume)
+        print_missing(execute_plan(plan, args.batch_size, args.resume + '.progress', args.workers, stats,
+                                   args.resume))
+        print_stats(stats)
+        return
+    if not args.directory:
         print("Proszę podać ścieżkę do folderu.")
+        return
+    if args.watch:
+        sniffer = Sniffer(args.sniff_cache) if args.sniff or args.sniff_cache else None
+        try:
+            watch_files(args.directory, args.workers, sniffer, stats, args.debounce, args.poll)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if sniffer is not None:
+                sniffer.close()
+            print_stats(stats)
+        return
+
+    state = DirectoryState.load(args.state) if args.state else None
+    sniffer = Sniffer(args.sniff_cache) if args.sniff or args.sniff_cache else None
+    try:
+        plan = build_plan(args.directory, args.workers, state, sniffer)
+    finally:
+        if sniffer is not None:
+            sniffer.close()
+    if args.dedup:
+        print_duplicates(deduplicate_plan(plan, args.dedup == 'link', max(args.workers, 4)))
+    if args.plan:
+        plan.save(args.plan)
+        print(f"Zapisano plan ({len(plan)} przeniesień) do pliku {args.plan}.")
+    if args.dry_run:
+        if not args.plan:
+            for source, destination in plan:
+                print(f"{source} -> {destination}")
+            for move, _ in plan.links:
+                source, destination = plan.paths(move)
+                print(f"{source} => {destination} (dowiązanie)")
+        return
+    progress_file = args.plan + '.progress' if args.plan else None
+    print_missing(execute_plan(plan, args.batch_size, progress_file, args.workers, stats, args.plan))
+    print_stats(stats)
+    if args.extract:
+        print_extract_failures(extract_archives(archive_jobs(plan), args.extract_workers))
+    if state is not None:
+        state.commit()
+        state.save()
+
+def print_duplicates(groups):
+    for group in groups:
+        print(f"Duplikaty pliku {group[0]}: {', '.join(group[1:])}")
+
+def print_missing(missing):
+    for source in missing:
+        print(f"Pominięto {source}: plik już nie istnieje")
+
+def print_extract_failures(failures):
+    for archive, error in failures:
+        print(f"Nie udało się rozpakować {archive}: {error}")
+
+def print_stats(stats):
+    if stats is not None:
+        for line in stats.report():
+            print(line)
+
+TRANSLITERATION = str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ', 'acelnoszzACELNOSZZ')
+NON_WORD = re.compile(r'\W+')
 
 def normalize(name):
-    transliteration = {'ą': 'a', 'ć': 'c', 'ę': 'e', 'ł': 'l', 'ń': 'n', 'ó': 'o', 'ś': 's', 'ź': 'z', 'ż': 'z'}
-    name = ''.join(transliteration.get(c, c) for c in name)
-    return re.sub(r'\W+', '_', name)
-
-def organize_files(directory):
-    file_categories = {
-        'images': ['jpeg', 'png', 'jpg', 'svg'],
-        'videos': ['avi', 'mp4', 'mov', 'mkv'],
-        'documents': ['doc', 'docx', 'txt', 'pdf', 'xlsx', 'pptx'],
-        'music': ['mp3', 'ogg', 'wav', 'amr'],
-        'archives': ['zip', 'gz', 'tar'],
-        'unknown': []
-    }
-
-    for category in file_categories.keys():
-        os.makedirs(os.path.join(directory, category), exist_ok=True)
-
-    for filename in os.listdir(directory):
-        if os.path.isfile(os.path.join(directory, filename)):
-            ext = filename.lower().split('.')[-1]
-            new_filename = normalize(filename)
-            for category, extensions in file_categories.items():
-                if ext in extensions:
-                    shutil.move(os.path.join(directory, filename), os.path.join(directory, category, new_filename))
-                    break
-            else:
-                if ext != new_filename.split('.')[-1]:
-                    shutil.move(os.path.join(directory, filename), os.path.join(directory, 'unknown', new_filename))
-    for foldername in os.listdir(directory):
-        subfolder = os.path.join(directory, foldername)
-        if os.path.isdir(subfolder) and foldername not in file_categories:
-            organize_files(subfolder)
+    return NON_WORD.sub('_', name.translate(TRANSLITERATION))
+
+# Bounded memo of normalize, measured against it in bench_normalize.py; the
+# sort paths call normalize directly
+normalize_cached = lru_cache(maxsize=65536)(normalize)
+
+def unique_name(folder, category, name, taken):
+    """Returns name, or name with a numeric suffix if it is already taken.
+
+    A name is taken when another planned move uses it or when a file with
+    that name already exists in the category folder.
+    """
+    candidate = name
+    counter = 1
+    while candidate in taken or os.path.lexists(os.path.join(folder, category, candidate)):
+        candidate = f"{name}_{counter}"
+        counter += 1
+    taken.add(candidate)
+    return candidate
+
+def plan_files(directory, filenames, sniffer=None):
+    """Plans the moves for the given files of a single folder.
+
+    Returns a list of (file name, category, new file name) moves. New names
+    never collide with each other or with files already in the category
+    folders. With a Sniffer, files whose extension has no category are
+    classified by their content.
+    """
+    files = [(filename, EXTENSION_CATEGORIES.get(filename.lower().split('.')[-1])) for filename in filenames]
+    if sniffer is not None:
+        unclassified = [filename for filename, category in files if category is None]
+        if unclassified:
+            paths = [os.path.join(directory, filename) for filename in unclassified]
+            sniffed = dict(zip(unclassified, sniffer.sniff(paths)))
+            files = [(filename, category or EXTENSION_CATEGORIES.get(sniffed.get(filename)))
+                     for filename, category in files]
+
+    taken = {category: set() for category in FILE_CATEGORIES}
+    moves = []
+    for filename, category in files:
+        new_filename = normalize(filename)
+        if category is None:
+            if filename.lower().split('.')[-1] == new_filename.split('.')[-1]:
+                continue
+            category = 'unknown'
+        new_filename = unique_name(directory, category, new_filename, taken[category])
+        moves.append((filename, category, new_filename))
+    return moves
+
+def plan_directory(directory, sniffer=None):
+    """Plans the moves for the files of a single folder.
+
+    Returns the moves from plan_files and the subfolders to visit.
+    """
+    # DirEntry caches the file type, so there is no extra stat per file
+    with os.scandir(directory) as it:
+        entries = list(it)
+
+    filenames = []
+    subfolders = []
+    for entry in entries:
+        if entry.is_file():
+            filenames.append(entry.name)
+        elif entry.is_dir() and entry.name not in FILE_CATEGORIES:
+            subfolders.append(entry.path)
+    return plan_files(directory, filenames, sniffer), subfolders
+
+def walk_tree(directory, visit, workers=1):
+    """Calls visit(folder) on every folder of the tree and yields the results.
+
+    visit returns a (result, subfolders) pair; the subfolders are visited
+    next. The walk uses an explicit work queue, so any depth works, and
+    each folder is visited once by (device, inode), so symlink loops end.
+    With workers > 1 the calls run on a thread pool.
+    """
+    seen = set()
+
+    def first_visit(folder):
+        try:
+            stat = os.stat(folder)
+        except OSError:
+            return False  # removed or a dangling link
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    if workers <= 1:
+        folders = [directory]
+        while folders:
+            folder = folders.pop()
+            if not first_visit(folder):
+                continue
+            result, subfolders = visit(folder)
+            yield folder, result, subfolders
+            folders.extend(reversed(subfolders))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        if first_visit(directory):
+            pending[executor.submit(visit, directory)] = directory
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder = pending.pop(future)
+                result, subfolders = future.result()
+                yield folder, result, subfolders
+                for subfolder in subfolders:
+                    if first_visit(subfolder):
+                        pending[executor.submit(visit, subfolder)] = subfolder
+
+def build_plan(directory, workers=1, state=None, sniffer=None):
+    """Walks the folder tree once and returns the MovePlan for it.
+
+    With a DirectoryState, folders that did not change since the previous
+    run are not listed again; only their subfolders are checked. A Sniffer
+    classifies files without a known extension by content.
+    """
+    directory = os.path.abspath(directory)
+    plan = MovePlan(directory, FILE_CATEGORIES)
+
+    def visit(folder):
+        if state is not None:
+            subfolders = state.unchanged_subfolders(folder)
+            if subfolders is not None:
+                return None, subfolders
+        return plan_directory(folder, sniffer)
+
+    for folder, moves, subfolders in walk_tree(directory, visit, workers):
+        if moves is None:
+            continue
+        if state is not None:
+            state.visited(folder, subfolders)
+        folder_index = plan.add_folder(folder)
+        for filename, category, new_filename in moves:
+            plan.add_move(folder_index, filename, category, new_filename)
+    return plan
+
+def archive_jobs(plan):
+    """Returns (archive, folder to unpack into) pairs for the archives in a plan."""
+    archive_extensions = tuple('.' + ext for ext in FILE_CATEGORIES['archives'])
+    taken = {}
+    jobs = []
+    for move in plan.moves:
+        folder_index, filename, category, _ = move
+        if category != 'archives':
+            continue
+        stem = filename
+        while stem.lower().endswith(archive_extensions):
+            stem = stem[:stem.rindex('.')]
+        folder = plan.folder_path(folder_index)
+        name = unique_name(folder, 'archives', normalize(stem), taken.setdefault(folder, set()))
+        jobs.append((plan.paths(move)[1], os.path.join(folder, 'archives', name)))
+    return jobs
+
+def organize_files(directory, workers=1, state_file=None, sniff=False, sniff_cache=None, dedup=None,
+                   extract=False):
+    """Sorts the folder tree: plans all moves first, then applies them.
+
+    state_file enables incremental runs, see DirectoryState. sniff turns on
+    content-based classification, with results cached in sniff_cache.
+    dedup is 'report' or 'link', see deduplicate_plan; the duplicate
+    groups found are returned. extract unpacks the archives that were
+    moved into archives/<name>/, see extract_archives.
+    """
+    state = DirectoryState.load(state_file) if state_file else None
+    sniffer = Sniffer(sniff_cache) if sniff or sniff_cache else None
+    try:
+        plan = build_plan(directory, workers, state, sniffer)
+    finally:
+        if sniffer is not None:
+            sniffer.close()
+    groups = deduplicate_plan(plan, dedup == 'link', max(workers, 4)) if dedup else []
+    execute_plan(plan, workers=workers)
+    if extract:
+        print_extract_failures(extract_archives(archive_jobs(plan)))
+    if state is not None:
+        state.commit()
+        state.save()
+    return groups
+
+def organize_new_files(directory, paths, sniffer=None, workers=1, stats=None):
+    """Sorts only the given files, e.g. the ones reported by watch mode.
+
+    Paths that are gone, are not files or lie inside a category folder
+    are ignored.
+    """
+    by_folder = {}
+    for path in paths:
+        folder, filename = os.path.split(path)
+        if os.path.basename(folder) not in FILE_CATEGORIES and os.path.isfile(path):
+            by_folder.setdefault(folder, []).append(filename)
+
+    plan = MovePlan(directory, FILE_CATEGORIES)
+    for folder, filenames in by_folder.items():
+        moves = plan_files(folder, filenames, sniffer)
+        if moves:
+            folder_index = plan.add_folder(folder)
+            for filename, category, new_filename in moves:
+                plan.add_move(folder_index, filename, category, new_filename)
+    execute_plan(plan, workers=workers, stats=stats)
+    return plan
+
+def watch_files(directory, workers=1, sniffer=None, stats=None, debounce=1.0, poll=False, stop=None):
+    """Sorts the tree once, then keeps sorting new files as they arrive.
+
+    Uses inotify on Linux and polling elsewhere, see clean_folder.watch.
+    Runs until the stop event is set or the process is interrupted.
+    """
+    directory = os.path.abspath(directory)
+    watch(directory,
+          lambda paths: organize_new_files(directory, paths, sniffer, workers, stats),
+          skip_names=FILE_CATEGORIES, debounce=debounce, poll=poll,
+          on_start=lambda: execute_plan(build_plan(directory, workers, sniffer=sniffer),
+                                        workers=workers, stats=stats),
+          stop=stop)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        organize_files(sys.argv[1])
-    else:
-        print("Proszę podać ścieżkę do folderu.")
+    main()
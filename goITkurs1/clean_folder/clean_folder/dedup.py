@@ -0,0 +1,146 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 64 * 1024  # bytes hashed from each end in the partial stage
+CHUNK_SIZE = 1024 * 1024  # read size of the full streaming hash
+
+
+def partial_hash(path, size):
+    """Hashes the first and the last block of a file."""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as file:
+        digest.update(file.read(BLOCK_SIZE))
+        if size > BLOCK_SIZE:
+            file.seek(max(size - BLOCK_SIZE, BLOCK_SIZE))
+            digest.update(file.read(BLOCK_SIZE))
+    return digest.digest()
+
+
+def full_hash(path):
+    digest = hashlib.blake2b()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb') as file:
+        while True:
+            count = file.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.digest()
+
+
+def split_groups(groups, key, executor):
+    """Splits every group by key(path, size) and keeps parts with 2+ files."""
+    files = [item for group in groups for item in group]
+    keys = executor.map(lambda item: key(*item), files)
+    result = {}
+    for item, value in zip(files, keys):
+        if value is not None:
+            result.setdefault((item[1], value), []).append(item)
+    return [group for group in result.values() if len(group) > 1]
+
+
+def find_duplicates(paths, workers=4, keepers=()):
+    """Returns groups of paths with identical contents, in input order.
+
+    Files are grouped by size first, then by a hash of their first and last
+    block, and only the remaining candidates are hashed in full. Files that
+    fit in the two blocks are never read twice. Empty files are ignored.
+
+    keepers are files that only count as the original of paths: a group
+    starts with one of them if it has any, and groups without paths are
+    dropped. Only keepers of the size of some path are read.
+    """
+    by_size = {}
+    for path in paths:
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            continue
+        if size:
+            by_size.setdefault(size, []).append((path, size))
+    keepers_by_size = {}
+    for path in keepers:
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            continue
+        if size in by_size:
+            keepers_by_size.setdefault(size, []).append((path, size))
+    for size, items in keepers_by_size.items():
+        by_size[size][:0] = items
+    keeper_set = {path for items in keepers_by_size.values() for path, _ in items}
+    groups = [group for group in by_size.values() if len(group) > 1]
+
+    def safe(function):
+        def key(path, size):
+            try:
+                return function(path, size)
+            except OSError:
+                return None  # unreadable files are never duplicates
+        return key
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        groups = split_groups(groups, safe(partial_hash), executor)
+        fully_read = [group for group in groups if group[0][1] <= 2 * BLOCK_SIZE]
+        remaining = [group for group in groups if group[0][1] > 2 * BLOCK_SIZE]
+        groups = fully_read + split_groups(remaining, safe(lambda path, size: full_hash(path)), executor)
+
+    result = []
+    for group in groups:
+        group = [path for path, _ in group]
+        # Keepers come first; one of them is enough as the original
+        group = group[:1] + [path for path in group[1:] if path not in keeper_set]
+        if len(group) > 1:
+            result.append(group)
+    order = {path: index for index, path in enumerate(paths)}
+    return sorted(result, key=lambda group: order[group[1] if group[0] in keeper_set else group[0]])
+
+
+def sorted_files(plan):
+    """Returns the files already in the category folders of the plan's folders."""
+    files = []
+    for folder_index in range(len(plan.folders)):
+        folder = plan.folder_path(folder_index)
+        for category in plan.categories:
+            try:
+                with os.scandir(os.path.join(folder, category)) as it:
+                    files.extend(entry.path for entry in it if entry.is_file(follow_symlinks=False))
+            except OSError:
+                continue
+    return files
+
+
+def deduplicate_plan(plan, link=False, workers=4):
+    """Takes duplicate files out of a MovePlan and returns the groups found.
+
+    Files already sorted into category folders are originals too, so a new
+    copy of them is a duplicate. Otherwise the first file of each group is
+    moved as planned. The other copies stay where they are, or, with
+    link=True, become hard links to the sorted or moved file.
+    """
+    sources = [plan.paths(move)[0] for move in plan.moves]
+    groups = find_duplicates(sources, workers, sorted_files(plan))
+    index = {source: position for position, source in enumerate(sources)}
+
+    duplicates = {}
+    for group in groups:
+        # A planned move by position, a sorted file by its path in the tree
+        keeper = index[group[0]] if group[0] in index else os.path.relpath(group[0], plan.root)
+        for path in group[1:]:
+            duplicates[index[path]] = keeper
+    if not duplicates:
+        return groups
+
+    moves = []
+    new_index = {}
+    for position, move in enumerate(plan.moves):
+        if position not in duplicates:
+            new_index[position] = len(moves)
+            moves.append(move)
+    if link:
+        plan.links.extend((plan.moves[position], new_index[keeper] if isinstance(keeper, int) else keeper)
+                          for position, keeper in duplicates.items())
+    plan.moves = moves
+    return groups
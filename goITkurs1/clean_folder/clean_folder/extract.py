@@ -0,0 +1,124 @@
+import gzip
+import os
+import shutil
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+CHUNK_SIZE = 1024 * 1024  # per-worker buffer, bounds the memory of a stream copy
+MAX_ARCHIVE_BYTES = 10 * 2**30  # unpacked bytes allowed per archive
+MIN_FREE_BYTES = 2**30  # disk space that must stay free while unpacking
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class LimitedWriter:
+    """Streams members to disk while enforcing the byte and free space limits."""
+    def __init__(self, destination, max_bytes, min_free_bytes):
+        self.destination = os.path.realpath(destination)
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.written = 0
+
+    def target(self, member_name):
+        """Returns the path for a member, refusing paths outside the destination."""
+        path = os.path.realpath(os.path.join(self.destination, member_name))
+        if os.path.commonpath([path, self.destination]) != self.destination:
+            raise ExtractionError(f"Niebezpieczna ścieżka w archiwum: {member_name}")
+        return path
+
+    def write(self, member_name, source, size):
+        if self.written + size > self.max_bytes:
+            raise ExtractionError("Przekroczono limit rozmiaru rozpakowanych danych")
+        if shutil.disk_usage(self.destination).free - size < self.min_free_bytes:
+            raise ExtractionError("Za mało miejsca na dysku")
+        path = self.target(member_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.written += len(chunk)
+                # Declared sizes can lie, so count the bytes actually written
+                if self.written > self.max_bytes:
+                    raise ExtractionError("Przekroczono limit rozmiaru rozpakowanych danych")
+                file.write(chunk)
+
+
+def extract_archive(archive, destination, max_bytes=MAX_ARCHIVE_BYTES, min_free_bytes=MIN_FREE_BYTES):
+    """Unpacks a zip, tar or gz archive into destination, member by member.
+
+    Runs in a worker process. On any error the partial output is removed
+    and the error is raised to the caller.
+    """
+    os.makedirs(destination, exist_ok=True)
+    writer = LimitedWriter(destination, max_bytes, min_free_bytes)
+    try:
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as zip_file:
+                for member in zip_file.infolist():
+                    if member.is_dir():
+                        os.makedirs(writer.target(member.filename), exist_ok=True)
+                        continue
+                    with zip_file.open(member) as source:
+                        writer.write(member.filename, source, member.file_size)
+        elif tarfile.is_tarfile(archive):
+            with tarfile.open(archive, 'r:*') as tar_file:
+                for member in tar_file:
+                    if member.isdir():
+                        os.makedirs(writer.target(member.name), exist_ok=True)
+                    elif member.isfile():
+                        with tar_file.extractfile(member) as source:
+                            writer.write(member.name, source, member.size)
+                    # links and devices are skipped on purpose
+        else:
+            with open(archive, 'rb') as file:
+                if file.read(2) != b'\x1f\x8b':
+                    raise ExtractionError("Nieznany format archiwum")
+            # A plain .gz holds one stream; its size is only known while unpacking
+            with gzip.open(archive, 'rb') as source:
+                writer.write(os.path.basename(destination), source, 0)
+    except BaseException:
+        shutil.rmtree(destination, ignore_errors=True)
+        raise
+    return writer.written
+
+
+def run_pool(jobs, workers, max_bytes, min_free_bytes):
+    """Returns the failed jobs and the jobs lost to a crashed worker."""
+    failures = []
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(extract_archive, archive, destination, max_bytes, min_free_bytes):
+                   (archive, destination) for archive, destination in jobs}
+        for future in as_completed(futures):
+            archive, destination = futures[future]
+            try:
+                future.result()
+            except BrokenProcessPool:
+                shutil.rmtree(destination, ignore_errors=True)
+                broken.append((archive, destination))
+            except Exception as error:
+                failures.append((archive, error))
+    return failures, broken
+
+
+def extract_archives(jobs, workers=None, max_bytes=MAX_ARCHIVE_BYTES, min_free_bytes=MIN_FREE_BYTES):
+    """Unpacks (archive, destination) jobs on a process pool.
+
+    Returns a list of (archive, error) pairs for the archives that failed.
+    A corrupt archive only fails its own job. If one takes down a worker
+    process, the jobs lost with it are retried one by one in fresh
+    processes, so only the culprit is reported.
+    """
+    failures, broken = run_pool(jobs, workers, max_bytes, min_free_bytes)
+    for job in broken:
+        job_failures, job_broken = run_pool([job], 1, max_bytes, min_free_bytes)
+        failures.extend(job_failures)
+        failures.extend((archive, ExtractionError("Proces rozpakowujący przerwał pracę"))
+                        for archive, _ in job_broken)
+    return failures
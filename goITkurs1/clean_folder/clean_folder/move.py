@@ -0,0 +1,121 @@
+import errno
+import os
+import shutil
+import threading
+import time
+
+COPY_CHUNK = 64 * 1024 * 1024  # bytes per copy_file_range/sendfile call
+BUFFER_SIZE = 8 * 1024 * 1024  # buffer for the plain read/write fallback
+# errno values of os.link on file systems without hard links
+NO_LINK_ERRORS = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOSYS, errno.EMLINK}
+
+
+class MoveStats:
+    """Per-category counters of moved files, bytes and time spent.
+
+    Safe to update from several threads of the executor.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.categories = {}  # category -> [files, renamed, copied, bytes, seconds]
+
+    def add(self, category, size, seconds, copied):
+        with self.lock:
+            counters = self.categories.setdefault(category, [0, 0, 0, 0, 0.0])
+            counters[0] += 1
+            counters[2 if copied else 1] += 1
+            counters[3] += size
+            counters[4] += seconds
+
+    def report(self):
+        """Returns one line per category with counts and throughput."""
+        lines = []
+        for category, (files, renamed, copied, size, seconds) in sorted(self.categories.items()):
+            throughput = size / seconds / 2**20 if seconds else 0.0
+            lines.append(f"{category}: {files} plików ({renamed} przemianowanych, {copied} skopiowanych), "
+                         f"{size / 2**20:.1f} MiB w {seconds:.2f} s, {throughput:.1f} MiB/s")
+        return lines
+
+
+def copy_contents(source_file, destination_file, size):
+    """Copies file data, preferring in-kernel copies over user space buffers."""
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                count = os.copy_file_range(source_fd, destination_fd, min(COPY_CHUNK, size - copied))
+                if count == 0:
+                    break
+                copied += count
+            return
+        except OSError as error:
+            if error.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    if hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                count = os.sendfile(destination_fd, source_fd, copied, min(COPY_CHUNK, size - copied))
+                if count == 0:
+                    break
+                copied += count
+            return
+        except OSError as error:
+            if error.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    # Carry on after whatever the kernel paths managed to copy
+    source_file.seek(copied)
+    destination_file.seek(copied)
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        count = source_file.readinto(buffer)
+        if not count:
+            break
+        destination_file.write(view[:count])
+
+
+def copy_file(source, destination):
+    """Copies data and metadata to a new file; a partial copy is removed on
+    failure. Raises FileExistsError if the destination exists."""
+    with open(source, 'rb') as source_file:
+        destination_file = open(destination, 'xb')
+        try:
+            with destination_file:
+                copy_contents(source_file, destination_file, os.fstat(source_file.fileno()).st_size)
+            shutil.copystat(source, destination)
+        except BaseException:
+            os.unlink(destination)
+            raise
+
+
+def move_file(source, destination, category=None, stats=None):
+    """Moves a file, renaming when possible and streaming the data otherwise.
+
+    An existing destination is never replaced; FileExistsError is raised
+    instead. The rename is a hard link plus unlink, which fails atomically
+    on an existing name, where plain rename would overwrite it.
+    """
+    start = time.perf_counter()
+    size = os.lstat(source).st_size
+    copied = False
+    try:
+        os.link(source, destination, follow_symlinks=False)
+        os.unlink(source)
+    except OSError as error:
+        if error.errno == errno.EXDEV:
+            if os.path.islink(source):
+                os.symlink(os.readlink(source), destination)
+            else:
+                copy_file(source, destination)
+            os.unlink(source)
+            copied = True
+        elif error.errno in NO_LINK_ERRORS:
+            if os.path.lexists(destination):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+            os.rename(source, destination)
+        else:
+            raise
+    if stats is not None:
+        stats.add(category, size, time.perf_counter() - start, copied)
@@ -0,0 +1,207 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from clean_folder.move import move_file
+
+
+class MovePlan:
+    """Every move organize_files decided on, kept until it is executed.
+
+    Folders are stored once, relative to the root; each move is a compact
+    (folder index, file name, category, new file name) tuple. Links are
+    (move, keeper) pairs for duplicates that become hard links instead of
+    being moved: to the destination of moves[keeper] for an index, or to
+    a file already sorted for a path relative to the root.
+    """
+    def __init__(self, root, categories, folders=None, moves=None, links=None):
+        self.root = os.path.abspath(root)
+        self.categories = list(categories)
+        self.folders = folders if folders is not None else []
+        self.moves = moves if moves is not None else []
+        self.links = links if links is not None else []
+
+    def add_folder(self, folder):
+        """Registers a folder and returns its index for add_move."""
+        self.folders.append(os.path.relpath(folder, self.root))
+        return len(self.folders) - 1
+
+    def add_move(self, folder_index, filename, category, new_filename):
+        self.moves.append((folder_index, filename, category, new_filename))
+
+    def folder_path(self, folder_index):
+        return os.path.normpath(os.path.join(self.root, self.folders[folder_index]))
+
+    def paths(self, move):
+        """Returns the source and destination path of a move."""
+        folder_index, filename, category, new_filename = move
+        folder = self.folder_path(folder_index)
+        return os.path.join(folder, filename), os.path.join(folder, category, new_filename)
+
+    def keeper_path(self, keeper):
+        """Returns the file a link points to, see the class docstring."""
+        if isinstance(keeper, int):
+            return self.paths(self.moves[keeper])[1]
+        return os.path.normpath(os.path.join(self.root, keeper))
+
+    def __len__(self):
+        return len(self.moves) + len(self.links)
+
+    def __iter__(self):
+        """Yields (source, destination) pairs in execution order."""
+        for move in self.moves:
+            yield self.paths(move)
+
+    def save(self, filename):
+        """Writes the plan to a JSON file, replacing it atomically."""
+        state = {'root': self.root, 'categories': self.categories,
+                 'folders': self.folders, 'moves': self.moves, 'links': self.links}
+        write_atomic(filename, json.dumps(state, ensure_ascii=False))
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, encoding='utf-8') as file:
+            state = json.load(file)
+        return cls(state['root'], state['categories'], state['folders'],
+                   [tuple(move) for move in state['moves']],
+                   [(tuple(move), keeper) for move, keeper in state.get('links', [])])
+
+
+def write_atomic(filename, text):
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_filename, filename)
+
+
+def read_progress(progress_file):
+    """Returns how many moves a previous run of the plan completed."""
+    try:
+        with open(progress_file, encoding='utf-8') as file:
+            return int(file.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def place_unique(plan, move, place, created):
+    """Calls place(destination) and returns the move with the name it used.
+
+    A destination taken since the plan was made (FileExistsError) is not
+    overwritten; the name gets a numeric suffix, as in unique_name, until
+    place succeeds. The category folder is created on first use and noted
+    in created. Returns None if the source file disappeared meanwhile.
+    """
+    folder_index, filename, category, new_filename = move
+    source = plan.paths(move)[0]
+    folder = os.path.join(plan.folder_path(folder_index), category)
+    if folder not in created:
+        try:
+            os.mkdir(folder)
+        except FileExistsError:
+            pass
+        created.add(folder)
+    candidate = new_filename
+    counter = 1
+    while True:
+        try:
+            place(os.path.join(folder, candidate))
+            return folder_index, filename, category, candidate
+        except FileExistsError:
+            candidate = f"{new_filename}_{counter}"
+            counter += 1
+        except FileNotFoundError:
+            if os.path.lexists(source):
+                raise
+            return None
+
+
+def apply_move(plan, move, stats=None, created=None):
+    """Applies a move and returns it with the new file name actually used,
+    or None if its source file is gone."""
+    source, destination = plan.paths(move)
+    if not os.path.lexists(source):
+        # A move finished just before a crash has no source left; skip it on resume
+        return move if os.path.lexists(destination) else None
+    return place_unique(plan, move, lambda destination: move_file(source, destination, move[2], stats),
+                        set() if created is None else created)
+
+
+def apply_link(plan, link, created=None):
+    """Applies a link and returns it with the new file name actually used,
+    or None if its source file is gone."""
+    move, keeper = link
+    source, destination = plan.paths(move)
+    if not os.path.lexists(source):
+        return link if os.path.lexists(destination) else None
+    keeper_destination = plan.keeper_path(keeper)
+
+    def place(destination):
+        try:
+            os.link(keeper_destination, destination)
+        except FileExistsError:
+            raise
+        except OSError:
+            move_file(source, destination, move[2])  # e.g. no hard links on this file system
+            return
+        os.unlink(source)
+
+    applied = place_unique(plan, move, place, set() if created is None else created)
+    return None if applied is None else (applied, keeper)
+
+
+def execute_plan(plan, batch_size=1000, progress_file=None, workers=1, stats=None, plan_file=None):
+    """Applies a plan in batches, checkpointing after each batch.
+
+    With progress_file set, the number of completed moves is stored there,
+    so running the same plan again after a crash resumes where it stopped.
+    Moves whose destination was taken meanwhile get a suffixed name, which
+    is written back into the plan and, with plan_file set, saved there
+    before the progress.
+    Pass a MoveStats to collect per-category throughput. Links are made
+    after all moves, once every keeper is in place. Category folders are
+    only created where a file goes into them.
+
+    Returns the source paths that no longer existed; their moves are
+    skipped and counted as done, so the plan can still finish.
+    """
+    created = set()
+    missing = []
+    done = read_progress(progress_file) if progress_file else 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        while done < len(plan.moves):
+            batch = plan.moves[done:done + batch_size]
+            # Every destination in a plan is unique, so a batch can run in any order
+            results = executor.map(lambda move: apply_move(plan, move, stats, created), batch)
+            applied = []
+            for move, result in zip(batch, results):
+                if result is None:
+                    missing.append(plan.paths(move)[0])
+                    result = move
+                applied.append(result)
+            plan.moves[done:done + len(batch)] = applied
+            done += len(batch)
+            if applied != batch and plan_file:
+                plan.save(plan_file)
+            if progress_file:
+                write_atomic(progress_file, str(done))
+
+    total = len(plan.moves) + len(plan.links)
+    while done < total:
+        start = done - len(plan.moves)
+        batch = plan.links[start:start + batch_size]
+        applied = []
+        for link in batch:
+            result = apply_link(plan, link, created)
+            if result is None:
+                missing.append(plan.paths(link[0])[0])
+                result = link
+            applied.append(result)
+        plan.links[start:start + len(batch)] = applied
+        done += len(batch)
+        if applied != batch and plan_file:
+            plan.save(plan_file)
+        if progress_file:
+            write_atomic(progress_file, str(done))
+    return missing
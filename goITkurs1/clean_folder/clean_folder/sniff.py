@@ -0,0 +1,86 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+HEADER_SIZE = 512  # enough for every signature below, including tar at 257
+
+# (offset, signature, extension); the extension picks the category
+SIGNATURES = [
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (0, b'\xff\xd8\xff', 'jpg'),
+    (0, b'%PDF-', 'pdf'),
+    (0, b'OggS', 'ogg'),
+    (0, b'ID3', 'mp3'),
+    (0, b'#!AMR', 'amr'),
+    (0, b'\x1a\x45\xdf\xa3', 'mkv'),
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'PK\x05\x06', 'zip'),
+    (0, b'\x1f\x8b', 'gz'),
+    (257, b'ustar', 'tar'),
+    (4, b'ftypqt', 'mov'),
+    (4, b'ftyp', 'mp4'),
+]
+RIFF_FORMATS = {b'WAVE': 'wav', b'AVI ': 'avi'}
+
+
+def match_signature(header):
+    """Returns the extension whose signature the header starts with, or None."""
+    if header[:4] == b'RIFF':
+        return RIFF_FORMATS.get(header[8:12])
+    for offset, signature, extension in SIGNATURES:
+        if header[offset:offset + len(signature)] == signature:
+            return extension
+    return None
+
+
+def read_header(path):
+    """Reads the start of a file with a single read call."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, HEADER_SIZE)
+    finally:
+        os.close(fd)
+
+
+class Sniffer:
+    """Classifies files by content for the files their extension can't place.
+
+    Reads are spread over a bounded thread pool and results are cached by
+    (device, inode, size, mtime), so a file is read at most once across
+    runs when the cache is saved to a file.
+    """
+    def __init__(self, cache_file=None, workers=4):
+        self.cache_file = cache_file
+        self.cache = {}
+        if cache_file:
+            try:
+                with open(cache_file, encoding='utf-8') as file:
+                    self.cache = json.load(file)
+            except (FileNotFoundError, ValueError):
+                pass
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def sniff_file(self, path):
+        try:
+            stat = os.stat(path)
+            key = f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+            if key in self.cache:
+                return self.cache[key]
+            extension = match_signature(read_header(path))
+        except OSError:
+            return None
+        self.cache[key] = extension
+        return extension
+
+    def sniff(self, paths):
+        """Returns the sniffed extension (or None) for each file path."""
+        return list(self.executor.map(self.sniff_file, paths))
+
+    def close(self):
+        """Stops the pool and saves the cache."""
+        self.executor.shutdown()
+        if self.cache_file:
+            temp_filename = self.cache_file + '.tmp'
+            with open(temp_filename, 'w', encoding='utf-8') as file:
+                json.dump(self.cache, file)
+            os.replace(temp_filename, self.cache_file)
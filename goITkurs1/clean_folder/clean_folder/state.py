@@ -0,0 +1,75 @@
+import json
+import os
+import time
+
+# Folders modified this recently are not cached: on file systems with coarse
+# timestamps a file added in the same tick would not change the mtime.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class DirectoryState:
+    """Folder signatures from the previous run of clean-folder.
+
+    For each visited folder the cache keeps its (device, inode, mtime) and
+    the names of its subfolders. A folder whose signature did not change has
+    no new files, so the next run only checks its subfolders.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.folders = {}  # path -> [device, inode, mtime_ns, subfolder names]
+        self.seen = {}  # path -> (signature or None, subfolder names) for this run
+
+    @classmethod
+    def load(cls, filename):
+        state = cls(filename)
+        try:
+            with open(filename, encoding='utf-8') as file:
+                state.folders = json.load(file)
+        except (FileNotFoundError, ValueError):
+            pass  # No usable cache, every folder counts as changed
+        return state
+
+    @staticmethod
+    def signature(path):
+        stat = os.stat(path)
+        return [stat.st_dev, stat.st_ino, stat.st_mtime_ns]
+
+    def unchanged_subfolders(self, folder):
+        """Returns the subfolders of an unchanged folder, or None if it changed."""
+        cached = self.folders.get(folder)
+        if cached is None:
+            return None
+        signature = self.signature(folder)
+        if cached[:3] != signature:
+            return None
+        self.seen[folder] = (signature, cached[3])
+        return [os.path.join(folder, name) for name in cached[3]]
+
+    def visited(self, folder, subfolders):
+        """Remembers a folder that was planned in this run."""
+        self.seen.setdefault(folder, (None, [os.path.basename(path) for path in subfolders]))
+
+    def commit(self):
+        """Replaces the cache with the folders seen in this run.
+
+        Call it after the plan was executed, so the signatures of changed
+        folders include the moves. Folders that disappeared are dropped.
+        """
+        folders = {}
+        now = time.time_ns()
+        for folder, (signature, subfolders) in self.seen.items():
+            if signature is None:
+                try:
+                    signature = self.signature(folder)
+                except FileNotFoundError:
+                    continue
+            if now - signature[2] >= RACY_WINDOW_NS:
+                folders[folder] = signature + [subfolders]
+        self.folders = folders
+        self.seen = {}
+
+    def save(self):
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'w', encoding='utf-8') as file:
+            json.dump(self.folders, file, ensure_ascii=False)
+        os.replace(temp_filename, self.filename)
@@ -0,0 +1,183 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def walk_folders(folder, skip_names):
+    """Yields (folder, file paths) for a tree, skipping the named folders."""
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [name for name in dirnames if name not in skip_names
+                       and not os.path.islink(os.path.join(dirpath, name))]
+        yield dirpath, [os.path.join(dirpath, name) for name in filenames]
+
+
+class InotifyWatcher:
+    """Reports new files in a tree using Linux inotify, one watch per folder."""
+    def __init__(self, root, skip_names):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.root = root
+        self.skip_names = skip_names
+        self.folders = {}  # watch descriptor -> folder path
+        self.add_tree(root)
+
+    def add_tree(self, folder):
+        """Watches every folder of a subtree and returns the files already in it."""
+        files = []
+        for dirpath, paths in walk_folders(folder, self.skip_names):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self.folders[wd] = dirpath
+            files.extend(paths)
+        return files
+
+    def read(self, timeout):
+        """Waits up to timeout seconds and returns the paths of new files."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        files = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0'))
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, so fall back to one full scan
+                files.extend(self.add_tree(self.root))
+                continue
+            if mask & IN_IGNORED:
+                self.folders.pop(wd, None)
+                continue
+            folder = self.folders.get(wd)
+            if folder is None:
+                continue
+            path = os.path.join(folder, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and name not in self.skip_names:
+                    files.extend(self.add_tree(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                files.append(path)
+        return files
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Reports new files by polling folder mtimes where inotify is missing.
+
+    Only folders whose mtime changed are listed again, so a poll costs one
+    stat per folder.
+    """
+    def __init__(self, root, skip_names, interval=2.0):
+        self.root = root
+        self.skip_names = skip_names
+        self.interval = interval
+        self.folders = {}  # folder -> (mtime_ns, subfolders)
+        self.last_poll = 0.0
+        self.poll()
+
+    def poll(self):
+        files = []
+        stack = [self.root]
+        seen = {}
+        while stack:
+            folder = stack.pop()
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            cached = self.folders.get(folder)
+            if cached and cached[0] == mtime:
+                subfolders = cached[1]
+            else:
+                subfolders = []
+                try:
+                    with os.scandir(folder) as it:
+                        for entry in it:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self.skip_names:
+                                    subfolders.append(entry.path)
+                            elif entry.is_file():
+                                files.append(entry.path)
+                except FileNotFoundError:
+                    continue
+            seen[folder] = (mtime, subfolders)
+            stack.extend(subfolders)
+        self.folders = seen
+        self.last_poll = time.monotonic()
+        return files
+
+    def read(self, timeout):
+        time.sleep(max(0.0, min(timeout, self.last_poll + self.interval - time.monotonic())))
+        if time.monotonic() - self.last_poll < self.interval:
+            return []
+        return self.poll()
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, skip_names=(), poll=False, poll_interval=2.0):
+    """Returns an inotify watcher on Linux, or a polling one otherwise."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, set(skip_names))
+        except (OSError, AttributeError):
+            pass  # e.g. inotify limits reached or no inotify in libc
+    return PollingWatcher(root, set(skip_names), poll_interval)
+
+
+def watch(root, handle, skip_names=(), debounce=1.0, poll=False, poll_interval=2.0,
+          on_start=None, stop=None):
+    """Calls handle(paths) with batches of files that appear in the tree.
+
+    Bursts are debounced: a batch is handled once no event arrived for
+    ``debounce`` seconds, or at the latest after ten times that. Folders
+    named in skip_names are not watched. on_start runs once the watches
+    are in place, so files arriving during it are not missed. An OSError
+    from handle is reported and the watching goes on. Runs until the stop
+    event is set.
+    """
+    stop = stop or threading.Event()
+    watcher = make_watcher(root, skip_names, poll, poll_interval)
+    try:
+        if on_start is not None:
+            on_start()
+        pending = {}
+        first_event = last_event = 0.0
+        while not stop.is_set():
+            files = watcher.read(debounce if pending else 1.0)
+            now = time.monotonic()
+            if files:
+                if not pending:
+                    first_event = now
+                pending.update(dict.fromkeys(files))
+                last_event = now
+            if pending and (now - last_event >= debounce or now - first_event >= 10 * debounce):
+                try:
+                    handle(list(pending))
+                except OSError as error:
+                    # e.g. a file removed before it was moved; the next batches still count
+                    print(f"Nie udało się posortować nowych plików: {error}")
+                pending = {}
+    finally:
+        watcher.close()
@@ -1,4 +1,5 @@
 from collections import UserDict
+import os
 import re
 import pickle
 from datetime import datetime, timedelta
@@ -115,9 +116,26 @@ class Record:
 
 class AddressBook(UserDict):
     """Class for the address book."""
+    journal = None  # Journal that persists changes, see load_address_book
+
+    def log_change(self, entry):
+        """Appends a change to the journal, if the book has one."""
+        if self.journal is not None:
+            self.journal.append(entry, self)
+
+    def apply_change(self, entry):
+        """Replays a single journal entry without journaling it again."""
+        if entry[0] == 'put':
+            _, name, record = entry
+            self.data[name] = record
+        elif entry[0] == 'delete':
+            _, name = entry
+            self.data.pop(name, None)
+
     def add_record(self, record: Record):
         """Adds an entry to the address book."""
         self.data[record.name.value] = record
+        self.log_change(('put', record.name.value, record))
         print("Dodano wpis.")
 
     def find_record(self, search_term):
@@ -141,6 +159,7 @@ class AddressBook(UserDict):
         """Deletes a record by name."""
         if name in self.data:
             del self.data[name]
+            self.log_change(('delete', name))
             print(f"Usunięto wpis: {name}.")
         else:
             print(f"Wpis o nazwie {name} nie istnieje.")
@@ -201,32 +220,130 @@ def edit_record(book):
         else:
             print("Brak numerów telefonu.")
 
+        book.log_change(('put', name_to_edit, record))
         print("Wpis zaktualizowany.")
     else:
         print("Wpisu nie znaleziono.")
 
+class Journal:
+    """Append-only log of address book changes on top of a pickled snapshot.
+
+    Changes are fsynced in batches of ``sync_every``; once the journal outgrows
+    the book it is compacted into a new snapshot, replaced atomically.
+    """
+    def __init__(self, filename, sync_every=100, compact_min=1000):
+        self.filename = filename
+        self.journal_filename = filename + '.journal'
+        self.sync_every = sync_every
+        self.compact_min = compact_min
+        self.file = None
+        self.entries = 0
+        self.pending = 0
+
+    def load(self):
+        """Returns the book from the snapshot with the journal replayed."""
+        book = AddressBook()
+        try:
+            with open(self.filename, 'rb') as file:
+                book.data = pickle.load(file)
+        except FileNotFoundError:
+            pass
+
+        self.entries = 0
+        valid_size = 0
+        try:
+            with open(self.journal_filename, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                while True:
+                    try:
+                        entry = pickle.load(file)
+                    except (EOFError, pickle.UnpicklingError):
+                        if file.tell() < size:
+                            raise  # Damage before the end is not a torn write
+                        break  # End of the journal or a torn write from a crash
+                    book.apply_change(entry)
+                    self.entries += 1
+                    valid_size = file.tell()
+        except FileNotFoundError:
+            pass
+
+        self.file = open(self.journal_filename, 'ab')
+        self.file.truncate(valid_size)
+        book.journal = self
+        return book
+
+    def append(self, entry, book):
+        """Writes an entry and syncs or compacts when a batch is full."""
+        pickle.dump(entry, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.entries += 1
+        self.pending += 1
+        if self.entries >= max(self.compact_min, len(book.data)):
+            self.compact(book)
+        elif self.pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Flushes pending journal entries to disk."""
+        if self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def compact(self, book):
+        """Writes a fresh snapshot and empties the journal."""
+        temp_filename = self.filename + '.tmp'
+        with open(temp_filename, 'wb') as file:
+            pickle.dump(book.data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.filename)
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.entries = 0
+        self.pending = 0
+
+def move_aside(filename):
+    """Renames a file to filename.bak, or .bak1, .bak2, ... if that is taken,
+    and returns the new name."""
+    candidate = filename + '.bak'
+    counter = 1
+    while os.path.lexists(candidate):
+        candidate = f"{filename}.bak{counter}"
+        counter += 1
+    os.rename(filename, candidate)
+    return candidate
+
 def save_address_book(book, filename='address_book.pkl'):
     try:
-        with open(filename, 'wb') as file:
-            pickle.dump(book.data, file)
+        if book.journal is None:
+            # The book was not loaded from these files, e.g. loading failed,
+            # so they are kept aside instead of being compacted over
+            for name in (filename, filename + '.journal'):
+                if os.path.exists(name):
+                    print(f"Plik {name} zachowano jako {move_aside(name)}.")
+            book.journal = Journal(filename)
+            book.journal.file = open(book.journal.journal_filename, 'ab')
+            book.journal.compact(book)
+        else:
+            book.journal.sync()
         print("Zapisano książkę adresową.")
     except Exception as e:
         print(f"Błąd przy zapisie książki adresowej: {e}")
 
 def load_address_book(filename='address_book.pkl'):
+    exists = os.path.exists(filename) or os.path.exists(filename + '.journal')
     try:
-        with open(filename, 'rb') as file:
-            data = pickle.load(file)
-        book = AddressBook()
-        book.data = data
-        print("Przywrócono książkę adresową.")
-        return book
-    except FileNotFoundError:
-        print("Plik nie istnieje, tworzenie nowej książki adresowej.")
-        return AddressBook()
+        book = Journal(filename).load()
     except Exception as e:
         print(f"Błąd przy ładowaniu książki adresowej: {e}")
+        print("Zapis utworzy nową książkę, a obecne pliki zostaną zachowane jako kopie .bak.")
         return AddressBook()
+    if exists:
+        print("Przywrócono książkę adresową.")
+    else:
+        print("Plik nie istnieje, tworzenie nowej książki adresowej.")
+    return book
 
 def input_phone():
     """Asks the user to enter a phone number."""
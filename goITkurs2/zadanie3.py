@@ -1,8 +1,16 @@
 from datetime import datetime, timedelta
 import calendar
 
-def get_birthdays_per_week(users):
-    today = datetime.now()
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by get_birthdays_per_week_batch
+    np = None
+
+ORDINAL_EPOCH = datetime(1970, 1, 1).toordinal()  # Ordinal of datetime64 day 0
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+def get_birthdays_per_week(users, today=None):
+    today = today or datetime.now()
     start_of_week = today - timedelta(days=today.weekday())
     end_of_week = start_of_week + timedelta(days=6)
 
@@ -23,6 +31,55 @@ def get_birthdays_per_week(users):
             day_of_week = calendar.day_name[birthday_this_year.weekday()]
             birthdays[day_of_week].append(user['name'])
 
+    print_birthdays(birthdays)
+
+def get_birthdays_per_week_batch(names, birthdays, today=None):
+    """Vectorized get_birthdays_per_week for columnar input.
+
+    ``birthdays`` is an array of datetime64 values or of ordinal dates
+    (``date.toordinal()``). Returns ``{day name: [names]}`` with the same
+    buckets get_birthdays_per_week would print, including 29 February
+    birthdays moving to 1 March in non-leap years.
+    """
+    if np is None:
+        raise ImportError("get_birthdays_per_week_batch wymaga pakietu numpy")
+    today = today or datetime.now()
+    names = np.asarray(names, dtype=object)
+    birthdays = np.asarray(birthdays)
+    if np.issubdtype(birthdays.dtype, np.datetime64):
+        birthdays = birthdays.astype('datetime64[D]')
+    else:
+        birthdays = (birthdays - ORDINAL_EPOCH).astype('datetime64[D]')
+
+    months = birthdays.astype('datetime64[M]')
+    month_index = months.astype(np.int64) % 12
+    day_index = (birthdays - months).astype(np.int64)
+    # Adding the day offset to the 1st of the month turns 29 February into
+    # 1 March in non-leap years, just like the fallback in the loop version.
+    this_year = (np.datetime64(str(today.year), 'M') + month_index).astype('datetime64[D]') + day_index
+    days = this_year.astype(np.int64)
+    weekdays = (days + EPOCH_WEEKDAY) % 7
+
+    # The week bounds keep the current time of day while birthdays are at
+    # midnight, so the first day only counts when today is exactly midnight.
+    start_day = today.toordinal() - today.weekday() - ORDINAL_EPOCH
+    end_day = start_day + 6
+    if today == datetime(today.year, today.month, today.day):
+        in_week = (days >= start_day) & (days <= end_day)
+    else:
+        in_week = (days > start_day) & (days <= end_day)
+
+    weekend = weekdays >= 5
+    in_week &= ~weekend
+    result = {}
+    for weekday, day in enumerate(calendar.day_name):
+        mask = in_week & (weekdays == weekday)
+        if weekday == 0:
+            mask |= weekend
+        result[day] = names[mask].tolist()
+    return result
+
+def print_birthdays(birthdays):
     for day, names in birthdays.items():
         if names:
             print(f"{day}: {', '.join(names)}")
@@ -37,4 +94,5 @@ users = [
     {"name": "Eustachy", "birthday": datetime(1993, 1, 15)},
 ]
 
-get_birthdays_per_week(users)
+if __name__ == "__main__":
+    get_birthdays_per_week(users)
@@ -1,3 +1,6 @@
+import argparse
+import sys
+
 def input_error(func):
     def inner(*args, **kwargs):
         try:
@@ -11,12 +14,35 @@ def input_error(func):
     return inner
 
 contacts = {}
+EXIT_COMMANDS = ["good bye", "close", "exit", "."]
+BATCH_BUFFER = 64 * 1024  # characters of replies collected before each write in batch mode
+
+# Trie of command names, one character per level; END marks a complete name
+COMMAND_TRIE = {}
+END = ""
+
+def command(*names, exact=False):
+    """Registers a handler under its command names and aliases.
 
+    With exact=True the command takes no arguments, so "show all x" is
+    not "show all".
+    """
+    def register(handler):
+        for name in names:
+            node = COMMAND_TRIE
+            for char in name:
+                node = node.setdefault(char, {})
+            node[END] = (handler, exact)
+        return handler
+    return register
+
+@command("add", "dodaj")
 def add_contact(args):
     name, phone = args.split()
     contacts[name] = phone
     return f"Dodano kontakt: {name}, numer: {phone}"
 
+@command("zmień", "zmien")
 def change_contact(args):
     name, phone = args.split()
     if name in contacts:
@@ -24,40 +50,104 @@ def change_contact(args):
         return f"Zmieniono numer dla {name} na {phone}"
     return "Nie znaleziono takiego kontaktu."
 
+@command("phone", "telefon")
 def phone_contact(args):
     return contacts.get(args, "Nie znaleziono takiego kontaktu.")
 
+@command("show all", "pokaż wszystkie", "pokaz wszystkie", exact=True)
 def show_all(args):
     return "\n".join(f"{name}: {phone}" for name, phone in contacts.items())
 
+@command("hello", "cześć", "czesc")
+def hello(args):
+    return "How can I help you?"
+
+def unknown_command(args):
+    return "Nie rozpoznano polecenia."
+
+def resolve_command(user_input):
+    """Finds the longest registered command at the start of a lowercased
+    line and returns (handler, args). Words may be separated by any
+    whitespace, as with split()."""
+    text = user_input.strip()
+    length = len(text)
+    node = COMMAND_TRIE
+    match = None
+    position = 0
+    while True:
+        if END in node and (position == length or text[position].isspace()):
+            match = node[END], position
+        if position == length:
+            break
+        char = text[position]
+        position += 1
+        if char.isspace():
+            while position < length and text[position].isspace():
+                position += 1
+            char = " "
+        node = node.get(char)
+        if node is None:
+            break
+    if match is None:
+        return unknown_command, text
+    (handler, exact), end = match
+    args = text[end:].lstrip()
+    if exact and args:
+        return unknown_command, args
+    return handler, args
+
 @input_error
-def handle_command(command, args):
-    if command == "add":
-        return add_contact(args)
-    elif command == "zmień" or command == "zmien":
-        return change_contact(args)
-    elif command == "phone":
-        return phone_contact(args)
-    elif command == "show" and args == "all":
-        return show_all(args)
-    elif command == "hello":
-        return "How can I help you?"
-    else:
-        return "Nie rozpoznano polecenia."
+def run_command(handler, args):
+    return handler(args)
+
+def handle_command(user_input):
+    return run_command(*resolve_command(user_input))
+
+
+def run_batch(lines, output):
+    """Answers commands read from lines and writes the replies to output in
+    chunks of about BATCH_BUFFER characters."""
+    replies = []
+    size = 0
+    for line in lines:
+        user_input = line.rstrip("\r\n").lower()
+        if user_input in EXIT_COMMANDS:
+            replies.append("Good bye!")
+            break
+        if user_input:
+            reply = handle_command(user_input)
+            replies.append(reply)
+            size += len(reply) + 1
+            if size >= BATCH_BUFFER:
+                replies.append("")
+                output.write("\n".join(replies))
+                replies = []
+                size = 0
+    if replies:
+        replies.append("")
+        output.write("\n".join(replies))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Bot kontaktów.")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="PLIK",
+                        help="wykonaj polecenia z pliku (lub ze standardowego wejścia) bez interakcji")
+    arguments = parser.parse_args()
+    if arguments.batch == "-":
+        run_batch(sys.stdin, sys.stdout)
+        return
+    if arguments.batch:
+        with open(arguments.batch, encoding="utf-8") as file:
+            run_batch(file, sys.stdout)
+        return
+
     while True:
         user_input = input(">> ").lower()
-        if user_input in ["good bye", "close", "exit", "."]:
+        if user_input in EXIT_COMMANDS:
             print("Good bye!")
             break
         if user_input:
-
-            parts = user_input.split()
-            command = parts[0]
-            args = " ".join(parts[1:])
-            print(handle_command(command, args))
+            print(handle_command(user_input))
 
 if __name__ == "__main__":
     main()
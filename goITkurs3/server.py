@@ -0,0 +1,88 @@
+"""Asyncio line protocol server for the contact bot.
+
+Every line a client sends is one command, understood as in main.py. The
+reply lines are followed by an empty line, so a client may send many
+commands at once and read the replies back in order. Empty lines get no
+reply. "show all" is streamed in chunks instead of as one string. All
+clients share the contacts of main.py.
+
+Usage: python server.py [--host 127.0.0.1] [--port 8888] [--unix /tmp/bot.sock]
+"""
+import argparse
+import asyncio
+
+from main import EXIT_COMMANDS, contacts, resolve_command, run_command, show_all
+
+LINE_LIMIT = 64 * 1024  # longest accepted command line in bytes
+SHOW_ALL_CHUNK = 1000  # contacts per write while streaming "show all"
+BACKLOG = 4096  # pending connections the listening socket queues
+
+
+async def stream_contacts(writer):
+    """Writes "name: phone" lines in chunks, waiting for slow clients."""
+    names = list(contacts)  # other clients may add contacts meanwhile
+    for start in range(0, len(names), SHOW_ALL_CHUNK):
+        chunk = "".join(f"{name}: {contacts[name]}\n" for name in names[start:start + SHOW_ALL_CHUNK])
+        writer.write(chunk.encode())
+        await writer.drain()
+
+
+async def handle_client(reader, writer):
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Line longer than LINE_LIMIT; the rest of the stream can't be trusted
+                writer.write("Nieprawidłowe dane wejściowe.\n\n".encode())
+                break
+            if not line:
+                break
+            user_input = line.decode(errors="replace").rstrip("\r\n").lower()
+            if user_input in EXIT_COMMANDS:
+                writer.write(b"Good bye!\n\n")
+                break
+            if not user_input.strip():
+                continue
+            handler, args = resolve_command(user_input)
+            if handler is show_all:
+                await stream_contacts(writer)
+                writer.write(b"\n")
+            else:
+                writer.write(f"{run_command(handler, args)}\n\n".encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host="127.0.0.1", port=8888, unix_path=None):
+    if unix_path:
+        server = await asyncio.start_unix_server(handle_client, unix_path, limit=LINE_LIMIT, backlog=BACKLOG)
+        print(f"Serwer nasłuchuje na gnieździe {unix_path}")
+    else:
+        server = await asyncio.start_server(handle_client, host, port, limit=LINE_LIMIT, backlog=BACKLOG)
+        print(f"Serwer nasłuchuje na {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serwer poleceń bota kontaktów.')
+    parser.add_argument('--host', default='127.0.0.1', help='adres nasłuchu (domyślnie 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8888, help='port (domyślnie 8888)')
+    parser.add_argument('--unix', help='ścieżka gniazda Unix zamiast TCP')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
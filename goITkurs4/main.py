@@ -1,6 +1,14 @@
 from collections import UserDict
 import re
 
+
+def phone_key(number):
+    """Zwraca same cyfry numeru telefonu, bez kierunkowego +48."""
+    digits = ''.join(char for char in number if char.isdigit())
+    if len(digits) == 11 and digits.startswith('48'):
+        digits = digits[2:]
+    return digits
+
 class Field:
     """Klasa bazowa dla pól wpisu."""
     def __init__(self, value):
@@ -38,40 +46,62 @@ class Email(Field):
 
 class Record:
     """Klasa wpisu w książce adresowej."""
+    _book = None  # Książka adresowa, która indeksuje ten wpis
+    _key = None  # Klucz wpisu w tej książce
+
     def __init__(self, name: Name):
         self.name = name
         self.phones = []
         self.emails = []
 
+    def _check_contacts(self, phones=(), emails=()):
+        """Pozwala książce odrzucić numer lub email innego wpisu."""
+        if self._book is not None:
+            self._book.check_contacts(self, phones, emails)
+
+    def _changed(self):
+        """Informuje książkę o zmianie wpisu."""
+        if self._book is not None:
+            self._book.record_changed(self)
+
     def add_phone(self, phone: Phone):
         """Dodaje numer telefonu."""
+        self._check_contacts(phones=[phone])
         self.phones.append(phone)
+        self._changed()
 
     def remove_phone(self, phone: Phone):
         """Usuwa numer telefonu."""
         self.phones.remove(phone)
+        self._changed()
 
     def edit_phone(self, old_phone: Phone, new_phone: Phone):
         """Zmienia numer telefonu."""
+        self._check_contacts(phones=[new_phone])
         self.remove_phone(old_phone)
         self.add_phone(new_phone)
 
     def add_email(self, email: Email):
         """Dodaje adres email."""
+        self._check_contacts(emails=[email])
         self.emails.append(email)
+        self._changed()
 
     def remove_email(self, email: Email):
         """Usuwa adres email."""
         self.emails.remove(email)
+        self._changed()
 
     def edit_email(self, old_email: Email, new_email: Email):
         """Zmienia adres email."""
+        self._check_contacts(emails=[new_email])
         self.remove_email(old_email)
         self.add_email(new_email)
 
     def edit_name(self, new_name: Name):
         """Zmienia imię i nazwisko."""
         self.name = new_name
+        self._changed()
 
     def __str__(self):
         """Zwraca string wpisu."""
@@ -80,33 +110,118 @@ class Record:
         return f"Imię i nazwisko: {self.name.value}, Telefony: {phones}, Email: {emails}"
 
 class AddressBook(UserDict):
-    """Klasa książki adresowej."""
+    """Klasa książki adresowej.
+
+    Imiona, numery telefonów i adresy email wpisów są indeksowane w
+    słownikach, więc find_record nie przegląda całej książki.
+    """
+    def __init__(self):
+        super().__init__()
+        self.name_index = {}  # imię i nazwisko małymi literami -> klucze wpisów
+        self.phone_index = {}  # phone_key -> klucze wpisów z tym numerem
+        self.email_index = {}  # email małymi literami -> klucze wpisów z tym adresem
+        self.record_keys = {}  # klucz wpisu -> (imię, numery, emaile) zapisane w indeksach
+        self.record_order = {}  # klucz wpisu -> kolejność dodania
+        self.next_order = 0
+        self.unique_contacts = False  # Odrzucaj numer lub email innego wpisu
+
+    def index_record(self, key, record):
+        """Dodaje wpis do indeksów."""
+        record._book = self
+        record._key = key
+        name = record.name.value.lower()
+        phones = {phone_key(phone.value) for phone in record.phones}
+        emails = {email.value.lower() for email in record.emails}
+        self.record_keys[key] = (name, phones, emails)
+        self.name_index.setdefault(name, set()).add(key)
+        for phone in phones:
+            self.phone_index.setdefault(phone, set()).add(key)
+        for email in emails:
+            self.email_index.setdefault(email, set()).add(key)
+        if key not in self.record_order:
+            self.record_order[key] = self.next_order
+            self.next_order += 1
+
+    def unindex_record(self, key, keep_order=False):
+        """Usuwa wpis z indeksów."""
+        name, phones, emails = self.record_keys.pop(key)
+        for index, values in ((self.name_index, [name]), (self.phone_index, phones),
+                              (self.email_index, emails)):
+            for value in values:
+                keys = index[value]
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+        if not keep_order:
+            del self.record_order[key]
+
+    def record_changed(self, record):
+        """Odświeża indeksy po zmianie wpisu."""
+        if self.data.get(record._key) is record:
+            self.unindex_record(record._key, keep_order=True)
+            self.index_record(record._key, record)
+
+    def check_contacts(self, record, phones=None, emails=None):
+        """Zgłasza ValueError, jeśli unique_contacts jest włączone, a numer
+        lub email (domyślnie wszystkie z wpisu) należy do innego wpisu."""
+        if not self.unique_contacts:
+            return
+        key = record._key if record._book is self else None
+        for phone in record.phones if phones is None else phones:
+            if self.phone_index.get(phone_key(phone.value), set()) - {key}:
+                raise ValueError(f"Numer telefonu {phone.value} jest już przypisany do innego wpisu")
+        for email in record.emails if emails is None else emails:
+            if self.email_index.get(email.value.lower(), set()) - {key}:
+                raise ValueError(f"Adres email {email.value} jest już przypisany do innego wpisu")
+
     def add_record(self, record: Record):
         """Dodaje wpis do książki adresowej."""
-        self.data[record.name.value] = record
+        key = record.name.value
+        old_record = self.data.get(key)
+        if old_record is not None:
+            # Wpis o tej samej nazwie jest zastępowany, więc jego dane nie blokują nowego
+            self.unindex_record(key, keep_order=True)
+        try:
+            self.check_contacts(record)
+        except ValueError:
+            if old_record is not None:
+                self.index_record(key, old_record)
+            raise
+        if old_record is not None:
+            old_record._book = None
+        self.data[key] = record
+        self.index_record(key, record)
         print(f"Dodano wpis.")
 
     def find_record(self, search_term):
-        """Znajduje wpisy zawierające dokładną podaną frazę."""
-        found_records = []
-        for record in self.data.values():
-            if search_term.lower() == record.name.value.lower():
-                found_records.append(record)
-                continue
-            for phone in record.phones:
-                if search_term == phone.value:
-                    found_records.append(record)
-                    break
-            for email in record.emails:
-                if search_term == email.value:
-                    found_records.append(record)
-                    break
-        return found_records
+        """Znajduje wpisy zawierające dokładną podaną frazę.
+
+        Imię i nazwisko jest porównywane bez względu na wielkość liter, email
+        dokładnie. Inne zapisy numeru telefonu obsługuje find_by_phone, a email
+        bez względu na wielkość liter find_by_email.
+        """
+        keys = set(self.name_index.get(search_term.lower(), ()))
+        keys |= self.phone_index.get(search_term, set())
+        keys.update(key for key in self.email_index.get(search_term.lower(), ())
+                    if any(email.value == search_term for email in self.data[key].emails))
+        return [self.data[key] for key in sorted(keys, key=self.record_order.__getitem__)]
+
+    def find_by_phone(self, number):
+        """Zwraca wpisy z podanym numerem telefonu."""
+        keys = self.phone_index.get(phone_key(number), ())
+        return [self.data[key] for key in sorted(keys, key=self.record_order.__getitem__)]
+
+    def find_by_email(self, address):
+        """Zwraca wpisy z podanym adresem email, bez względu na wielkość liter."""
+        keys = self.email_index.get(address.strip().lower(), ())
+        return [self.data[key] for key in sorted(keys, key=self.record_order.__getitem__)]
 
     def delete_record(self, name):
         """Usuwa rekord o podanej nazwie."""
         if name in self.data:
-            del self.data[name]
+            record = self.data.pop(name)
+            self.unindex_record(name)
+            record._book = None
             print(f"Usunięto wpis: {name}.")
         else:
             print(f"Wpis o nazwie {name} nie istnieje.")
@@ -171,7 +286,10 @@ def main():
         action = input("Wybierz akcję: dodaj (d), znajdź (z), usuń (u), koniec (q): ")
         if action in ['dodaj', 'd']:
             record = create_record()
-            book.add_record(record)
+            try:
+                book.add_record(record)
+            except ValueError as e:
+                print(e)
         elif action in ['znajdź', 'znajdz', 'z']:
             search = input("Wpisz szukaną frazę: ")
             found = book.find_record(search)